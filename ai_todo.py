@@ -1,93 +1,205 @@
 import streamlit as st
-import json
+import io
 import os
 from datetime import datetime, timedelta
-from langchain_openai import AzureChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
-from langchain.prompts import ChatPromptTemplate
-from langchain.chains import LLMChain
 import pandas as pd
-import re
+from llm_cache import run_cached, run_cached_many
+from llm_client import get_llm
+from llm_streaming import stream_cached, write_stream
+from task_store import ConflictError, open_task_store
+from task_model import Category, Priority, Status, Task, format_field, now
+from task_query import SORT_KEYS, filter_tasks, page_tasks
+from task_summarizer import TaskSummarizer, format_task_lines
+from structured_output import JSONObjectStreamParser, validate_suggestion
+from task_io import FORMATS, export_tasks, import_tasks
+from task_state import SharedTasks
+from task_dedup import NearDuplicateIndex
+from metrics import admin_enabled, render_admin_panel, timed
 
-# Set up environment variables
-os.environ["AZURE_OPENAI_API_KEY"] = "api key here"
-os.environ["AZURE_OPENAI_ENDPOINT"] = "https://genaideployment.openai.azure.com"
-os.environ["AZURE_OPENAI_DEPLOYMENT"] = "gpt-4o"
-os.environ["AZURE_OPENAI_API_VERSION"] = "2024-12-01-preview"
+# Set up environment variables (values already set in the environment take precedence)
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "api key here")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://genaideployment.openai.azure.com")
+os.environ.setdefault("AZURE_OPENAI_DEPLOYMENT", "gpt-4o")
+os.environ.setdefault("AZURE_OPENAI_API_VERSION", "2024-12-01-preview")
+
+# Open the task store once per server process
+@st.cache_resource(show_spinner=False)
+def get_task_store():
+    return open_task_store()
+
+# Load the tasks and build their indexes, counters and reminder thread once per server process.
+# Sessions read this shared copy instead of holding their own.
+@st.cache_resource(show_spinner=False)
+def get_shared_tasks():
+    return SharedTasks(
+        get_task_store(),
+        duplicate_threshold=float(os.environ.get("DUPLICATE_TASK_THRESHOLD", "0.6")),
+        reminder_interval=int(os.environ.get("REMINDER_INTERVAL", "60")),
+    )
 
 # Initialize session state
-if 'tasks' not in st.session_state:
-    st.session_state.tasks = []
+# Position in the shared reminder log up to which this session has shown reminders, None until the first run
+if 'reminder_position' not in st.session_state:
+    st.session_state.reminder_position = None
 if 'ai_suggestions' not in st.session_state:
     st.session_state.ai_suggestions = []
-if 'edit_index' not in st.session_state:
-    st.session_state.edit_index = -1
+# Accepted suggestions and skipped duplicates of the last batch generation
+if 'batch_suggestions' not in st.session_state:
+    st.session_state.batch_suggestions = None
+if 'edit_task_id' not in st.session_state:
+    st.session_state.edit_task_id = None
+    # Version of the task when editing started, so saving fails if someone changed it meanwhile
+    st.session_state.edit_task_version = None
+# Message about a change that was rejected because the task had been changed elsewhere
+if 'task_conflict' not in st.session_state:
+    st.session_state.task_conflict = None
+# Cursors of the task list pages visited so far, the last one is the current page
+if 'page_cursors' not in st.session_state:
+    st.session_state.page_cursors = [None]
+if 'page_view' not in st.session_state:
+    st.session_state.page_view = None
+if 'task_summarizer' not in st.session_state:
+    st.session_state.task_summarizer = TaskSummarizer(max_chunk_size=int(os.environ.get("SUMMARY_CHUNK_SIZE", "50")))
 
-# Set up Azure OpenAI
+# Set up Azure OpenAI, reusing the process-wide client once it exists
 def setup_azure_openai():
     try:
-        llm = AzureChatOpenAI(
-            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-            api_key=os.environ["AZURE_OPENAI_API_KEY"],
-            api_version=os.environ["AZURE_OPENAI_API_VERSION"],
-            deployment_name=os.environ["AZURE_OPENAI_DEPLOYMENT"],
-            temperature=0.7
-        )
-        return llm
+        return get_llm()
     except Exception as e:
         st.error(f"Error initializing Azure OpenAI: {str(e)}")
         return None
 
-# Initialize LLM
-llm = setup_azure_openai()
+# Function to generate AI task suggestions.
+# With stream=True suggestions are yielded one by one as soon as each is complete.
+def generate_task_suggestions(user_context, stream=False):
+    suggestions = iter_task_suggestions(user_context)
+    return suggestions if stream else list(suggestions)
 
-# Function to generate AI task suggestions
-def generate_task_suggestions(user_context):
+# Function to return the prompt for task suggestions and the model to send it to
+def suggestion_prompt(llm):
+    from langchain.prompts import ChatPromptTemplate
+    
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "You are a helpful productivity assistant. Suggest 3-5 specific, actionable tasks based on the user's context. "
+                   "Return only JSON of the form {{\"tasks\": [{{\"title\": \"...\", \"description\": \"...\"}}]}}."),
+        ("human", "User context: {context}\n\nPlease suggest relevant tasks:")
+    ])
+    
+    # Ask for JSON mode so the response is always a parseable JSON object
+    if os.environ.get("LLM_JSON_MODE", "1") != "0":
+        llm = llm.bind(response_format={"type": "json_object"})
+    return prompt, llm
+
+# Function to stream the model's response and yield each valid suggestion as it is parsed
+def iter_task_suggestions(user_context):
+    llm = setup_azure_openai()
     if not llm:
-        return ["Please check your Azure OpenAI configuration"]
+        yield {"title": "Configuration error", "description": "Please check your Azure OpenAI configuration"}
+        return
     
     try:
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a helpful productivity assistant. Suggest 3-5 specific, actionable tasks based on the user's context. Return the tasks as a JSON array of objects with 'title' and 'description' fields."),
-            ("human", "User context: {context}\n\nPlease suggest relevant tasks:")
-        ])
-        
-        chain = LLMChain(llm=llm, prompt=prompt)
-        response = chain.run(context=user_context)
+        prompt, llm = suggestion_prompt(llm)
+        parser = JSONObjectStreamParser()
+        response = ""
+        found = 0
+        for text in stream_cached(llm, prompt, context=user_context):
+            response += text
+            for candidate in parser.feed(text):
+                suggestion = validate_suggestion(candidate)
+                if suggestion:
+                    found += 1
+                    yield suggestion
         
-        # Try to parse the response as JSON
-        try:
-            # Extract JSON from the response if it's wrapped in text
-            json_match = re.search(r'\[.*\]', response, re.DOTALL)
-            if json_match:
-                suggestions = json.loads(json_match.group())
-                return suggestions
-            else:
-                return [{"title": "Parse error", "description": "Could not parse AI response"}]
-        except json.JSONDecodeError:
-            # If JSON parsing fails, return the raw response as a single suggestion
-            return [{"title": "AI Suggestion", "description": response}]
+        if not found:
+            # If no suggestion could be parsed, return the raw response as a single suggestion
+            yield {"title": "AI Suggestion", "description": response}
             
     except Exception as e:
-        return [{"title": "Error", "description": f"Failed to generate suggestions: {str(e)}"}]
+        yield {"title": "Error", "description": f"Failed to generate suggestions: {str(e)}"}
+
+# Function to generate suggestions for many contexts, sending the requests concurrently.
+# Returns (suggestions, errors) where errors lists (context, message) for the failed requests.
+@timed("generate_batch_suggestions")
+def generate_batch_suggestions(contexts):
+    llm = setup_azure_openai()
+    if not llm:
+        return [], [(context, "Please check your Azure OpenAI configuration") for context in contexts]
+    
+    prompt, llm = suggestion_prompt(llm)
+    suggestions = []
+    errors = []
+    responses = run_cached_many(llm, prompt, [{"context": context} for context in contexts])
+    for context, response in zip(contexts, responses):
+        if isinstance(response, Exception):
+            errors.append((context, str(response)))
+            continue
+        parsed = [suggestion for suggestion in map(validate_suggestion, JSONObjectStreamParser().feed(response)) if suggestion]
+        if not parsed:
+            errors.append((context, "No task suggestions in the response"))
+        suggestions.extend(parsed)
+    return suggestions, errors
+
+# Function to read batch generation contexts from an uploaded file: one per line of a .txt file,
+# or one per row of a .csv file's "context" column (its first column if there is none)
+def read_contexts(file):
+    if file.name.lower().endswith(".csv"):
+        frame = pd.read_csv(file, dtype=str, keep_default_na=False)
+        column = "context" if "context" in frame.columns else frame.columns[0]
+        lines = frame[column].tolist()
+    else:
+        lines = io.TextIOWrapper(file, encoding="utf-8").read().splitlines()
+    return [line.strip() for line in lines if line.strip()]
+
+# Function to return the existing task a title nearly duplicates, or None
+def find_duplicate_task(title):
+    return get_shared_tasks().find_duplicate(title)
+
+# Function to split suggestions into accepted ones and skipped (suggestion, reason) pairs,
+# skipping near duplicates of existing tasks and of suggestions accepted before them
+def dedupe_suggestions(suggestions):
+    accepted_index = NearDuplicateIndex(threshold=get_shared_tasks().duplicate_threshold)
+    accepted = []
+    skipped = []
+    for suggestion in suggestions:
+        existing = find_duplicate_task(suggestion["title"])
+        if existing is not None:
+            skipped.append((suggestion, f"similar to task '{existing.title}'"))
+            continue
+        match = accepted_index.find(suggestion["title"])
+        if match:
+            skipped.append((suggestion, f"similar to suggestion '{accepted[match[0]]['title']}'"))
+            continue
+        accepted_index.add(len(accepted), suggestion["title"])
+        accepted.append(suggestion)
+    return accepted, skipped
 
-# Function to summarize tasks
-def summarize_tasks(tasks):
+# Function to summarize tasks.
+# With stream=True the summary is returned as a token stream instead of a string.
+def summarize_tasks(tasks, stream=False):
+    llm = setup_azure_openai()
     if not llm:
         return "Please check your Azure OpenAI configuration"
     
     try:
-        # Prepare task data for summarization
-        task_data = "\n".join([f"{i+1}. {task['title']} - {task['description']} ({task['status']})" 
-                              for i, task in enumerate(tasks)])
+        from langchain.prompts import ChatPromptTemplate
         
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a productivity expert. Provide a concise summary (max 50 words) of these tasks, highlighting priorities and overall progress."),
-            ("human", "Tasks:\n{task_data}\n\nSummary:")
-        ])
+        summarizer = st.session_state.task_summarizer
+        if len(tasks) > summarizer.max_chunk_size:
+            # Too many tasks for one prompt: summarize category/priority chunks, then combine them
+            prompt, inputs = summarizer.prepare(llm, tasks)
+        else:
+            # Prepare task data for summarization
+            inputs = {"task_data": format_task_lines(tasks)}
+            
+            prompt = ChatPromptTemplate.from_messages([
+                ("system", "You are a productivity expert. Provide a concise summary (max 50 words) of these tasks, highlighting priorities and overall progress."),
+                ("human", "Tasks:\n{task_data}\n\nSummary:")
+            ])
         
-        chain = LLMChain(llm=llm, prompt=prompt)
-        response = chain.run(task_data=task_data)
+        if stream:
+            return stream_cached(llm, prompt, on_error=lambda e: f"Failed to generate summary: {str(e)}", **inputs)
+        
+        response = run_cached(llm, prompt, **inputs)
         return response
             
     except Exception as e:
@@ -95,56 +207,107 @@ def summarize_tasks(tasks):
 
 # Function to add a task
 def add_task(title, description, priority, due_date=None, category="Personal"):
-    new_task = {
-        "id": len(st.session_state.tasks) + 1,
-        "title": title,
-        "description": description,
-        "priority": priority,
-        "category": category,
-        "status": "Pending",
-        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
-        "due_date": due_date.strftime("%Y-%m-%d") if due_date else None,
-        "completed_at": None
-    }
-    st.session_state.tasks.append(new_task)
+    new_task = Task(
+        id=None,
+        title=title,
+        description=description,
+        priority=Priority.parse(priority),
+        category=Category.parse(category),
+        status=Status.PENDING,
+        created_at=now(),
+        due_date=due_date,
+        completed_at=None
+    )
+    stored = get_task_store().add(new_task.to_record())
+    new_task.id, new_task.version = stored["id"], stored["version"]
+    get_shared_tasks().apply([new_task])
     return new_task
 
+# Function to add AI suggestions as tasks in one store transaction, returns the number added
+def add_suggested_tasks(suggestions):
+    created_at = now()
+    tasks = [
+        Task(
+            id=None,
+            title=suggestion["title"],
+            description=suggestion["description"],
+            priority=Priority.MEDIUM,
+            category=Category.AI_SUGGESTED,
+            status=Status.PENDING,
+            created_at=created_at,
+            due_date=None,
+            completed_at=None
+        )
+        for suggestion in suggestions
+    ]
+    added = get_task_store().add_many([task.to_record() for task in tasks])
+    remember_tasks(added)
+    return len(added)
+
+# Function to add task records that are already in the store to the shared tasks and indexes
+def remember_tasks(records):
+    get_shared_tasks().apply([Task.from_record(record) for record in records])
+
+# Function to write changed fields (model values) of a task with a compare-and-swap on its version.
+# Returns False, keeping the stored task, if it was changed or deleted elsewhere.
+def write_task(task_id, changes, expected_version=None):
+    shared = get_shared_tasks()
+    task = shared.tasks[task_id]
+    expected_version = expected_version or task.version
+    fields = {field: format_field(field, value) for field, value in changes.items()}
+    try:
+        if not get_task_store().update(task_id, fields, expected_version=expected_version):
+            shared.forget([task_id])
+            st.session_state.task_conflict = f"'{task.title}' was deleted by someone else."
+            return False
+    except ConflictError as e:
+        shared.apply([Task.from_record(e.current)])
+        st.session_state.task_conflict = f"'{task.title}' was changed by someone else, your change was not saved. Please try again."
+        return False
+    shared.apply([task.replace(**changes, version=expected_version + 1)])
+    return True
+
 # Function to update a task
-def update_task(index, title, description, priority, due_date=None, category="Personal", status="Pending"):
-    if 0 <= index < len(st.session_state.tasks):
-        st.session_state.tasks[index]["title"] = title
-        st.session_state.tasks[index]["description"] = description
-        st.session_state.tasks[index]["priority"] = priority
-        st.session_state.tasks[index]["category"] = category
-        st.session_state.tasks[index]["due_date"] = due_date.strftime("%Y-%m-%d") if due_date else None
-        st.session_state.tasks[index]["status"] = status
-        
-        if status == "Completed":
-            st.session_state.tasks[index]["completed_at"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-        else:
-            st.session_state.tasks[index]["completed_at"] = None
-            
-        return True
-    return False
+# expected_version is the version the user started editing, by default the one this session has
+def update_task(task_id, title, description, priority, due_date=None, category="Personal", status="Pending", expected_version=None):
+    if task_id not in get_shared_tasks().tasks:
+        return False
+    
+    changes = {
+        "title": title,
+        "description": description,
+        "priority": Priority.parse(priority),
+        "category": Category.parse(category),
+        "due_date": due_date,
+        "status": Status.parse(status),
+    }
+    
+    if changes["status"] is Status.COMPLETED:
+        changes["completed_at"] = now()
+    else:
+        changes["completed_at"] = None
+    
+    return write_task(task_id, changes, expected_version)
 
 # Function to delete a task
-def delete_task(index):
-    if 0 <= index < len(st.session_state.tasks):
-        del st.session_state.tasks[index]
-        return True
-    return False
+def delete_task(task_id):
+    if task_id not in get_shared_tasks().tasks:
+        return False
+    get_task_store().delete(task_id)
+    get_shared_tasks().forget([task_id])
+    return True
 
 # Function to toggle task status
-def toggle_task_status(index):
-    if 0 <= index < len(st.session_state.tasks):
-        if st.session_state.tasks[index]["status"] == "Pending":
-            st.session_state.tasks[index]["status"] = "Completed"
-            st.session_state.tasks[index]["completed_at"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-        else:
-            st.session_state.tasks[index]["status"] = "Pending"
-            st.session_state.tasks[index]["completed_at"] = None
-        return True
-    return False
+def toggle_task_status(task_id):
+    task = get_shared_tasks().tasks.get(task_id)
+    if task is None:
+        return False
+    
+    if task.status is Status.PENDING:
+        changes = {"status": Status.COMPLETED, "completed_at": now()}
+    else:
+        changes = {"status": Status.PENDING, "completed_at": None}
+    return write_task(task_id, changes)
 
 # Main application
 def main():
@@ -154,6 +317,23 @@ def main():
         layout="wide"
     )
     
+    # Pick up tasks changed by other server processes since the last run
+    shared = get_shared_tasks()
+    shared.sync()
+    if st.session_state.task_conflict:
+        st.warning(st.session_state.task_conflict)
+        st.session_state.task_conflict = None
+    
+    # Show reminders the scheduler recorded since the last run, or every task due now when the session starts
+    if st.session_state.reminder_position is None:
+        st.session_state.reminder_position, reminders = shared.reminders.current()
+    else:
+        st.session_state.reminder_position, reminders = shared.reminders.since(st.session_state.reminder_position)
+    for reminder in reminders[:3]:
+        st.toast(f"⏰ {reminder}")
+    if len(reminders) > 3:
+        st.toast(f"⏰ {len(reminders) - 3} more tasks are overdue or due soon")
+    
     # Custom CSS
     st.markdown("""
     <style>
@@ -215,6 +395,29 @@ def main():
                 else:
                     st.error("Please provide a task title")
         
+        # Bulk import and export
+        with st.expander("📁 Import / Export"):
+            uploaded_file = st.file_uploader("Import tasks", type=FORMATS)
+            if uploaded_file and st.button("Import Tasks"):
+                file_format = uploaded_file.name.rsplit(".", 1)[-1].lower()
+                try:
+                    with st.spinner("Importing tasks..."):
+                        imported, errors = import_tasks(uploaded_file, file_format, get_task_store(), on_batch=remember_tasks)
+                    st.success(f"Imported {imported} tasks")
+                    if errors:
+                        st.warning("Skipped invalid rows:\n" + "\n".join(f"- Row {row}: {message}" for row, message in errors[:10]))
+                except Exception as e:
+                    st.error(f"Import failed: {str(e)}")
+            
+            export_format = st.selectbox("Export format", FORMATS)
+            if st.button("Prepare Export"):
+                export_file = io.BytesIO()
+                export_tasks((task.to_record() for task in shared.tasks.values()), export_format, export_file)
+                st.session_state.export_file = (export_format, export_file.getvalue())
+            if st.session_state.get("export_file"):
+                file_format, data = st.session_state.export_file
+                st.download_button(f"Download tasks.{file_format}", data, file_name=f"tasks.{file_format}")
+        
         st.markdown("---")
         st.header("AI Features")
         
@@ -224,8 +427,14 @@ def main():
         
         if st.button("🤖 Generate Task Suggestions"):
             if context:
-                with st.spinner("Generating AI suggestions..."):
-                    st.session_state.ai_suggestions = generate_task_suggestions(context)
+                # List each suggestion as soon as it has been received
+                st.session_state.ai_suggestions = []
+                progress = st.empty()
+                with st.spinner("Generating AI suggestions..."), timed("generate_task_suggestions"):
+                    for suggestion in generate_task_suggestions(context, stream=True):
+                        st.session_state.ai_suggestions.append(suggestion)
+                        progress.markdown("\n".join(f"- {s['title']}" for s in st.session_state.ai_suggestions))
+                progress.empty()
             else:
                 st.warning("Please provide some context for AI suggestions")
         
@@ -235,7 +444,10 @@ def main():
             for i, suggestion in enumerate(st.session_state.ai_suggestions):
                 with st.expander(f"Suggestion {i+1}: {suggestion.get('title', 'No title')}"):
                     st.write(suggestion.get('description', 'No description'))
-                    if st.button(f"Add This Task", key=f"add_suggestion_{i}"):
+                    duplicate = find_duplicate_task(suggestion.get('title', ''))
+                    if duplicate is not None:
+                        st.caption(f"⚠️ Similar to existing task '{duplicate.title}'")
+                    if st.button("Add Anyway" if duplicate is not None else "Add This Task", key=f"add_suggestion_{i}"):
                         add_task(
                             suggestion.get('title', 'AI Suggested Task'),
                             suggestion.get('description', ''),
@@ -245,13 +457,39 @@ def main():
                         )
                         st.success("Task added from suggestion!")
         
+        # Batch generation: one request per context, sent concurrently
+        with st.expander("📚 Batch Generate from File"):
+            contexts_file = st.file_uploader("Contexts (one per line, or a CSV context column)", type=["txt", "csv"])
+            if contexts_file and st.button("🤖 Generate Batch"):
+                contexts = read_contexts(contexts_file)
+                with st.spinner(f"Generating suggestions for {len(contexts)} contexts..."):
+                    suggestions, errors = generate_batch_suggestions(contexts)
+                    accepted, skipped = dedupe_suggestions(suggestions)
+                st.session_state.batch_suggestions = (accepted, skipped)
+                if errors:
+                    st.warning("Failed contexts:\n" + "\n".join(f"- {context[:50]}: {message}" for context, message in errors[:10]))
+            
+            if st.session_state.batch_suggestions:
+                accepted, skipped = st.session_state.batch_suggestions
+                st.write(f"{len(accepted)} new suggestions, {len(skipped)} duplicates skipped")
+                st.markdown("\n".join(f"- {suggestion['title']}" for suggestion in accepted))
+                if skipped:
+                    st.caption("Skipped: " + "; ".join(f"'{suggestion['title']}' ({reason})" for suggestion, reason in skipped[:20]))
+                if accepted and st.button("Add All Suggestions"):
+                    added = add_suggested_tasks(accepted)
+                    st.session_state.batch_suggestions = None
+                    st.success(f"Added {added} tasks")
+        
         # Task summary
-        if st.session_state.tasks:
+        if shared.tasks:
             st.markdown("---")
             if st.button("📊 Generate Summary"):
-                summary = summarize_tasks(st.session_state.tasks)
                 st.subheader("Task Summary")
-                st.info(summary)
+                with timed("summarize_tasks"):
+                    write_stream(summarize_tasks(list(shared.tasks.values()), stream=True), element="info")
+        
+        if admin_enabled():
+            render_admin_panel()
     
     # Main content area
     col1, col2 = st.columns([2, 1])
@@ -259,7 +497,8 @@ def main():
     with col1:
         st.header("Your Tasks")
         
-        # Filter options
+        # Search and filter options
+        search_query = st.text_input("🔍 Search tasks", placeholder="Search titles and descriptions")
         col1a, col1b, col1c = st.columns(3)
         with col1a:
             filter_status = st.selectbox("Filter by Status", ["All", "Pending", "Completed"])
@@ -268,25 +507,44 @@ def main():
         with col1c:
             filter_category = st.selectbox("Filter by Category", ["All", "Work", "Personal", "Health", "Learning", "Other", "AI Suggested"])
         
-        # Apply filters
-        filtered_tasks = st.session_state.tasks
-        if filter_status != "All":
-            filtered_tasks = [t for t in filtered_tasks if t["status"] == filter_status]
-        if filter_priority != "All":
-            filtered_tasks = [t for t in filtered_tasks if t["priority"] == filter_priority]
-        if filter_category != "All":
-            filtered_tasks = [t for t in filtered_tasks if t["category"] == filter_category]
+        # Search results are only those tasks matching every word, best matches first by default
+        search_scores = shared.search.search(search_query) if search_query.strip() else None
+        col1d, col1e = st.columns(2)
+        with col1d:
+            sort_by = st.selectbox("Sort by", (["Relevance"] if search_scores is not None else []) + list(SORT_KEYS))
+        with col1e:
+            page_size = st.selectbox("Tasks per page", [10, 20, 50, 100], index=1)
+        
+        # Start again from the first page whenever the view changes
+        page_view = (search_query, filter_status, filter_priority, filter_category, sort_by, page_size)
+        if st.session_state.page_view != page_view:
+            st.session_state.page_view = page_view
+            st.session_state.page_cursors = [None]
+        
+        # Apply filters and cut out the current page
+        tasks = shared.tasks
+        if search_scores is None:
+            candidates = tasks.values()
+        else:
+            # Another session may have deleted a task between the search and reading the task dict
+            candidates = [tasks[task_id] for task_id in search_scores if task_id in tasks]
+        filtered_tasks = filter_tasks(candidates, filter_status, filter_priority, filter_category)
+        if sort_by == "Relevance":
+            sort_key = lambda task: (-search_scores[task.id], task.id)
+        else:
+            sort_key = SORT_KEYS[sort_by]
+        page, next_cursor = page_tasks(filtered_tasks, sort_key, st.session_state.page_cursors[-1], page_size)
         
         # Display tasks
-        if filtered_tasks:
-            for i, task in enumerate(filtered_tasks):
+        if page:
+            for task in page:
                 # Determine CSS class based on priority and status
                 css_class = "task-card"
-                if task["status"] == "Completed":
+                if task.status is Status.COMPLETED:
                     css_class += " task-completed"
-                elif task["priority"] == "High":
+                elif task.priority is Priority.HIGH:
                     css_class += " task-high"
-                elif task["priority"] == "Medium":
+                elif task.priority is Priority.MEDIUM:
                     css_class += " task-medium"
                 else:
                     css_class += " task-low"
@@ -295,117 +553,172 @@ def main():
                 
                 col2a, col2b = st.columns([4, 1])
                 with col2a:
-                    st.markdown(f"**{task['title']}**")
-                    st.markdown(f"_{task['description']}_" if task['description'] else "*No description*")
-                    st.caption(f"Category: {task['category']} | Priority: {task['priority']} | Created: {task['created_at']}")
-                    if task['due_date']:
-                        st.caption(f"Due: {task['due_date']}")
-                    if task['completed_at']:
-                        st.caption(f"Completed: {task['completed_at']}")
+                    st.markdown(f"**{task.title}**")
+                    st.markdown(f"_{task.description}_" if task.description else "*No description*")
+                    st.caption(f"Category: {task.category} | Priority: {task.priority} | Created: {format_field('created_at', task.created_at)}")
+                    if task.due_date:
+                        st.caption(f"Due: {format_field('due_date', task.due_date)}")
+                    if task.completed_at:
+                        st.caption(f"Completed: {format_field('completed_at', task.completed_at)}")
                 
                 with col2b:
                     # Toggle status button
-                    status_text = "✓ Done" if task['status'] == "Pending" else "↻ Reopen"
-                    if st.button(status_text, key=f"status_{i}"):
-                        toggle_task_status(i)
+                    status_text = "✓ Done" if task.status is Status.PENDING else "↻ Reopen"
+                    if st.button(status_text, key=f"status_{task.id}"):
+                        toggle_task_status(task.id)
                         st.rerun()
                     
                     # Edit button
-                    if st.button("✏️ Edit", key=f"edit_{i}"):
-                        st.session_state.edit_index = i
+                    if st.button("✏️ Edit", key=f"edit_{task.id}"):
+                        st.session_state.edit_task_id = task.id
+                        st.session_state.edit_task_version = task.version
                         st.rerun()
                     
                     # Delete button
-                    if st.button("🗑️ Delete", key=f"delete_{i}"):
-                        delete_task(i)
+                    if st.button("🗑️ Delete", key=f"delete_{task.id}"):
+                        delete_task(task.id)
                         st.rerun()
                 
                 st.markdown('</div>', unsafe_allow_html=True)
+            
+            # Page navigation
+            page_number = len(st.session_state.page_cursors)
+            col1f, col1g, col1h = st.columns([1, 2, 1])
+            with col1f:
+                if page_number > 1 and st.button("← Previous"):
+                    st.session_state.page_cursors.pop()
+                    st.rerun()
+            with col1g:
+                st.caption(f"Page {page_number} | {len(filtered_tasks)} matching tasks")
+            with col1h:
+                if next_cursor is not None and st.button("Next →"):
+                    st.session_state.page_cursors.append(next_cursor)
+                    st.rerun()
+        elif st.session_state.page_cursors[-1] is not None:
+            # Everything on this page was deleted, step back a page
+            st.session_state.page_cursors.pop()
+            st.rerun()
+        elif search_scores is not None:
+            st.info("No tasks match your search.")
         else:
             st.info("No tasks found. Add some tasks using the sidebar!")
     
     with col2:
         st.header("Task Statistics")
         
-        if st.session_state.tasks:
-            # Calculate statistics
-            total_tasks = len(st.session_state.tasks)
-            completed_tasks = len([t for t in st.session_state.tasks if t["status"] == "Completed"])
+        stats = shared.stats
+        if stats.total:
+            # Read statistics from the running counters, which other sessions may be updating
+            with shared.lock:
+                total_tasks = stats.total
+                completed_tasks = stats.count("status", "Completed")
+                priority_data = stats.distribution("priority", ["High", "Medium", "Low"])
+                category_counts = stats.distribution("category")
+                tasks = shared.tasks
             pending_tasks = total_tasks - completed_tasks
             
-            high_priority = len([t for t in st.session_state.tasks if t["priority"] == "High"])
-            medium_priority = len([t for t in st.session_state.tasks if t["priority"] == "Medium"])
-            low_priority = len([t for t in st.session_state.tasks if t["priority"] == "Low"])
-            
             # Display stats
             st.metric("Total Tasks", total_tasks)
             st.metric("Completed", completed_tasks)
             st.metric("Pending", pending_tasks)
             
+            # Earliest overdue and upcoming tasks, read from the due-date index
+            overdue = shared.due_index.overdue(count=5)
+            due_soon = shared.due_index.due_soon(count=5)
+            if overdue or due_soon:
+                st.subheader("Reminders")
+                for label, entries in (("🔴 Overdue", overdue), ("🟡 Due soon", due_soon)):
+                    for due, task_id in entries:
+                        if task_id in tasks:
+                            st.markdown(f"{label}: **{tasks[task_id].title}** ({due.isoformat()})")
+            
             st.subheader("Priority Distribution")
-            priority_data = {
-                "High": high_priority,
-                "Medium": medium_priority,
-                "Low": low_priority
-            }
             st.bar_chart(priority_data)
             
             st.subheader("Category Distribution")
-            category_counts = {}
-            for task in st.session_state.tasks:
-                category = task["category"]
-                category_counts[category] = category_counts.get(category, 0) + 1
-            
             st.bar_chart(category_counts)
+            
+            # Trends, cached until a task changes
+            report = shared.report()
+            st.subheader("Progress")
+            col2c, col2d = st.columns(2)
+            with col2c:
+                st.metric("Completion Rate", f"{report['summary']['completion_rate']:.0%}")
+                st.metric("Overdue", report["summary"]["overdue"])
+            with col2d:
+                st.metric("Due in 3 Days", report["summary"]["due_soon"])
+                if report["completion_hours"]:
+                    st.metric("Median Time to Complete", f"{report['completion_hours']['p50']:.1f} h")
+            if report["completion_hours"]:
+                st.caption("Time to complete: " + " | ".join(f"{name}: {hours:.1f} h" for name, hours in report["completion_hours"].items()))
+            
+            st.subheader("Burndown (last 30 days)")
+            st.line_chart(report["burndown"])
+            
+            st.subheader("Completion Rate by Category")
+            st.bar_chart(report["completion_by_category"])
         else:
             st.info("No tasks to display statistics")
     
     # Edit task modal
-    if st.session_state.edit_index >= 0 and st.session_state.edit_index < len(st.session_state.tasks):
-        task = st.session_state.tasks[st.session_state.edit_index]
+    if st.session_state.edit_task_id in shared.tasks:
+        task = shared.tasks[st.session_state.edit_task_id]
         
         with st.form("edit_form"):
             st.subheader("Edit Task")
             
-            edit_title = st.text_input("Task Title", value=task["title"])
-            edit_description = st.text_area("Description", value=task["description"])
+            edit_title = st.text_input("Task Title", value=task.title)
+            edit_description = st.text_area("Description", value=task.description)
             
             col3, col4 = st.columns(2)
             with col3:
                 edit_priority = st.selectbox("Priority", ["High", "Medium", "Low"], 
-                                           index=["High", "Medium", "Low"].index(task["priority"]))
+                                           index=["High", "Medium", "Low"].index(task.priority.label))
             with col4:
                 edit_category = st.selectbox("Category", ["Work", "Personal", "Health", "Learning", "Other", "AI Suggested"],
-                                          index=["Work", "Personal", "Health", "Learning", "Other", "AI Suggested"].index(task["category"]))
+                                          index=["Work", "Personal", "Health", "Learning", "Other", "AI Suggested"].index(task.category.label))
             
+            # Overdue tasks keep their date selectable so they can still be edited
+            current_due_date = task.due_date or datetime.now().date()
             edit_due_date = st.date_input("Due Date", 
-                                        value=datetime.strptime(task["due_date"], "%Y-%m-%d") if task["due_date"] else datetime.now().date(),
-                                        min_value=datetime.now().date())
+                                        value=current_due_date,
+                                        min_value=min(current_due_date, datetime.now().date()))
             
             edit_status = st.selectbox("Status", ["Pending", "Completed"], 
-                                     index=0 if task["status"] == "Pending" else 1)
+                                     index=0 if task.status is Status.PENDING else 1)
             
             col5, col6 = st.columns(2)
             with col5:
                 if st.form_submit_button("Save Changes"):
-                    update_task(
-                        st.session_state.edit_index,
+                    updated = update_task(
+                        st.session_state.edit_task_id,
                         edit_title,
                         edit_description,
                         edit_priority,
                         edit_due_date,
                         edit_category,
-                        edit_status
+                        edit_status,
+                        expected_version=st.session_state.edit_task_version
                     )
-                    st.session_state.edit_index = -1
-                    st.success("Task updated successfully!")
+                    st.session_state.edit_task_id = None
+                    if updated:
+                        st.success("Task updated successfully!")
                     st.rerun()
             
             with col6:
                 if st.form_submit_button("Cancel"):
-                    st.session_state.edit_index = -1
+                    st.session_state.edit_task_id = None
                     st.rerun()
+        
+        # Stores that keep a mutation log can show the latest changes made to the task, read only on request
+        if hasattr(get_task_store(), "history"):
+            with st.expander("Change History"):
+                if st.checkbox("Show recent changes", key=f"show_history_{task.id}"):
+                    for record in get_task_store().history(task_id=task.id, limit=20):
+                        changes = ", ".join(f"{field}: {value}" for field, value in record["fields"].items())
+                        st.caption(f"{record['at']} - {record['op']}" + (f" ({changes})" if changes else ""))
 
 if __name__ == "__main__":
-    main()
+    with timed("todo_rerun"):
+        main()
 
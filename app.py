@@ -2,193 +2,225 @@ import streamlit as st
 import json
 import os
 from datetime import datetime
-from langchain_openai import AzureChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
-from langchain.prompts import ChatPromptTemplate
-from langchain.chains import LLMChain
 import re
+from llm_cache import run_cached
+from llm_client import get_llm
+from llm_streaming import stream_cached, write_stream
+from faq_index import FAQIndex
+from chat_history import ConversationHistory
+from intent_router import IntentRouter
+from knowledge_base import KnowledgeBaseLoader
+from metrics import admin_enabled, get_metrics, render_admin_panel, timed, timed_response
 
-# Set up environment variables
-os.environ["AZURE_OPENAI_API_KEY"] = "your api key"
-os.environ["AZURE_OPENAI_ENDPOINT"] = "https://genaideployment.openai.azure.com"
-os.environ["AZURE_OPENAI_DEPLOYMENT"] = "gpt-4o"
-os.environ["AZURE_OPENAI_API_VERSION"] = "2024-12-01-preview"
+# Set up environment variables (values already set in the environment take precedence)
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "your api key")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://genaideployment.openai.azure.com")
+os.environ.setdefault("AZURE_OPENAI_DEPLOYMENT", "gpt-4o")
+os.environ.setdefault("AZURE_OPENAI_API_VERSION", "2024-12-01-preview")
 
 # Initialize session state
 if 'conversation_history' not in st.session_state:
-    st.session_state.conversation_history = []
+    st.session_state.conversation_history = ConversationHistory(
+        window=int(os.environ.get("CHAT_HISTORY_WINDOW", "50")),
+        archive_dir=os.environ.get("CHAT_ARCHIVE_DIR", "chat_archive")
+    )
 if 'user_info' not in st.session_state:
     st.session_state.user_info = {}
 
-# Sample data - in a real application, this would be in separate JSON files
-faq_data = {
-    "programs": [
-        {
-            "name": "Women in Leadership",
-            "duration": "12 weeks",
-            "format": "Online with weekly live sessions",
-            "certificate": "Yes, upon completion",
-            "mentors": ["Sarah Johnson", "Maria Rodriguez"]
-        },
-        {
-            "name": "Executive Leadership Masterclass",
-            "duration": "8 weeks",
-            "format": "Hybrid (online + 2 in-person workshops)",
-            "certificate": "Yes, with distinction levels",
-            "mentors": ["Robert Chen", "Amanda Williams"]
-        },
-        {
-            "name": "Emerging Leaders Program",
-            "duration": "6 weeks",
-            "format": "Fully online, self-paced",
-            "certificate": "Yes, participation certificate",
-            "mentors": ["David Wilson", "Jessica Brown"]
-        }
-    ],
-    "general": [
-        {
-            "question": "How do I apply for a program?",
-            "answer": "You can apply through our website by filling out the application form for your program of interest. Our team will review your application and contact you within 5-7 business days."
-        },
-        {
-            "question": "Are scholarships available?",
-            "answer": "Yes, we offer limited scholarships based on merit and financial need. Please indicate your interest in scholarship opportunities when applying."
-        },
-        {
-            "question": "What is the time commitment for programs?",
-            "answer": "Most programs require 4-6 hours per week, including live sessions, assignments, and group activities. Specific time commitments are detailed in each program description."
-        }
-    ]
-}
+# Programs, FAQs and mentors are loaded from the knowledge base files in KNOWLEDGE_BASE_DIR,
+# by default the data directory next to this script
+@st.cache_resource(show_spinner=False)
+def get_knowledge_base_loader():
+    default_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+    return KnowledgeBaseLoader(os.environ.get("KNOWLEDGE_BASE_DIR", default_directory),
+                               check_interval=float(os.environ.get("KB_RELOAD_INTERVAL", "2")))
+
+# Function to get the current knowledge base, picking up edited files
+def get_knowledge_base():
+    return get_knowledge_base_loader().current()
 
-mentor_data = [
+# Intents recognised by handle_user_message, in priority order.
+# Weak keywords such as "women" only route a message together with another keyword.
+intents = [
+    {
+        "name": "programs",
+        "keywords": {"program": 1, "course": 1, "training": 1, "executive": 0.5, "women": 0.5, "leadership": 0.5}
+    },
     {
-        "name": "Sarah Johnson",
-        "role": "Leadership Coach",
-        "bio": "With over 15 years of experience in executive coaching, Sarah specializes in helping women break through glass ceilings in corporate environments.",
-        "expertise": ["Corporate Leadership", "Women Empowerment", "Career Transition"],
-        "image": "👩‍💼"
+        "name": "mentors",
+        "keywords": {"mentor": 1, "coach": 1, "advisor": 1, "teacher": 1, "instructor": 1}
     },
     {
-        "name": "Robert Chen",
-        "role": "Executive Advisor",
-        "bio": "Former Fortune 500 executive who now dedicates his time to developing the next generation of leaders through practical, real-world strategies.",
-        "expertise": ["Strategic Planning", "Change Management", "Executive Presence"],
-        "image": "👨‍💼"
+        "name": "application",
+        "keywords": {"apply": 1, "application": 1, "enroll": 1, "register": 1, "join": 1},
+        "response": "To apply for any of our programs, please visit our website and fill out the application form for your program of interest. Our team will review your application and contact you within 5-7 business days. Would you like me to help you with any specific program application?"
     },
     {
-        "name": "Maria Rodriguez",
-        "role": "Entrepreneurship Mentor",
-        "bio": "Successful entrepreneur and investor who focuses on helping leaders build sustainable businesses with strong social impact.",
-        "expertise": ["Entrepreneurship", "Social Impact", "Business Development"],
-        "image": "👩‍🎓"
+        "name": "pricing",
+        "keywords": {"cost": 1, "price": 1, "fee": 1, "tuition": 1, "scholarship": 1, "financial": 1},
+        "response": "Program fees vary depending on the program length and format. We also offer scholarships based on merit and financial need. For specific pricing information and scholarship opportunities, please visit our website or contact our admissions team. Would you like information about a specific program?"
     }
 ]
 
-# Set up Azure OpenAI
+# Fixed replies by intent name
+canned_responses = {entry["name"]: entry["response"] for entry in intents if "response" in entry}
+
+# Set up Azure OpenAI, reusing the process-wide client once it exists
 def setup_azure_openai():
     try:
-        llm = AzureChatOpenAI(
-            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-            api_key=os.environ["AZURE_OPENAI_API_KEY"],
-            api_version=os.environ["AZURE_OPENAI_API_VERSION"],
-            deployment_name=os.environ["AZURE_OPENAI_DEPLOYMENT"],
-            temperature=0.7
-        )
-        return llm
+        return get_llm()
     except Exception as e:
         st.error(f"Error initializing Azure OpenAI: {str(e)}")
         return None
 
-# Initialize LLM
-llm = setup_azure_openai()
-
 # Function to get program information
 def get_program_info(program_name=None):
     if program_name:
-        for program in faq_data["programs"]:
-            if program_name.lower() in program["name"].lower():
-                return program
-        return None
+        return get_knowledge_base().find_program(program_name)
     else:
-        return faq_data["programs"]
+        return get_knowledge_base().programs
+
+# Function to format a program for chat responses
+def format_program(program):
+    response = f"**{program['name']}**\n"
+    response += f"- Duration: {program['duration']}\n"
+    response += f"- Format: {program['format']}\n"
+    response += f"- Certificate: {program['certificate']}\n"
+    response += f"- Mentors: {', '.join(program['mentors'])}\n\n"
+    return response
+
+# Function to format a mentor for chat responses
+def format_mentor(mentor):
+    response = f"**{mentor['name']}** - {mentor['role']}\n"
+    response += f"- Bio: {mentor['bio']}\n"
+    response += f"- Expertise: {', '.join(mentor['expertise'])}\n\n"
+    return response
+
+# Function to get the rendered markdown of the current knowledge base
+def get_rendered_responses():
+    knowledge_base = get_knowledge_base()
+    return build_rendered_responses(knowledge_base.version, knowledge_base)
+
+# Render the program and mentor markdown once per knowledge base version, so replies and the
+# sidebar reuse the same strings until the data files change
+@st.cache_resource(show_spinner=False, max_entries=1)
+def build_rendered_responses(version, _knowledge_base):
+    program_blocks = [format_program(program) for program in _knowledge_base.programs]
+    mentor_blocks = [format_mentor(mentor) for mentor in _knowledge_base.mentors]
+    return {
+        "program_blocks": program_blocks,
+        "mentor_blocks": mentor_blocks,
+        "programs": ("We offer the following leadership programs:\n\n" + "".join(program_blocks)
+                     + "Would you like more information about any specific program?"),
+        "mentors": ("Our programs are led by experienced mentors:\n\n" + "".join(mentor_blocks)
+                    + "Would you like to know more about any specific mentor?"),
+        # (name, markdown) of each sidebar expander
+        "sidebar_programs": [
+            (program["name"], "\n\n".join([
+                f"**Duration:** {program['duration']}",
+                f"**Format:** {program['format']}",
+                f"**Certificate:** {program['certificate']}",
+                f"**Mentors:** {', '.join(program['mentors'])}",
+            ]))
+            for program in _knowledge_base.programs
+        ],
+        # Program context sent along with AI questions
+        "program_info": str(_knowledge_base.programs),
+    }
 
-# Function to get FAQ answers
-def get_faq_answer(question):
-    for faq in faq_data["general"]:
-        if faq["question"].lower() in question.lower():
-            return faq["answer"]
+# Function to get the FAQ retrieval index of the current knowledge base
+def get_faq_index():
+    knowledge_base = get_knowledge_base()
+    return build_faq_index(knowledge_base.version, knowledge_base)
+
+# Build the FAQ retrieval index once per knowledge base version
+@st.cache_resource(show_spinner=False, max_entries=1)
+def build_faq_index(version, _knowledge_base):
+    rendered = build_rendered_responses(version, _knowledge_base)
+    entries = [(faq["question"], faq["answer"]) for faq in _knowledge_base.faqs]
+    # Names get an entry of their own so a short "who is ..." question is not diluted by the details
+    for program, block in zip(_knowledge_base.programs, rendered["program_blocks"]):
+        answer = block.strip()
+        entries.append((program["name"], answer))
+        entries.append((f"{program['name']} program {program['duration']} {program['format']}", answer))
+    for mentor, block in zip(_knowledge_base.mentors, rendered["mentor_blocks"]):
+        answer = block.strip()
+        entries.append((mentor["name"], answer))
+        entries.append((f"{mentor['role']} {' '.join(mentor['expertise'])}", answer))
+    return FAQIndex(entries, threshold=float(os.environ.get("FAQ_MATCH_THRESHOLD", "0.5")))
+
+# Function to build the reply shown when the AI call fails
+def llm_error_message(e):
+    return f"I apologize, but I'm having trouble processing your request right now. Please try again later. Error: {str(e)}"
+
+# Function to get FAQ answers.
+# With stream=True an AI-generated answer is returned as a token stream instead of a string.
+# history holds earlier (role, text) turns to send along for multi-turn answers.
+@timed_response("get_faq_answer")
+def get_faq_answer(question, stream=False, history=None):
+    match = get_faq_index().match(question)
+    if match:
+        get_metrics().increment("faq_answers_total", source="index")
+        return match[0]
+    get_metrics().increment("faq_answers_total", source="llm")
     
     # If no direct match, use AI to generate response
+    llm = setup_azure_openai()
     if llm:
         try:
+            from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+            
             prompt = ChatPromptTemplate.from_messages([
                 ("system", "You are a helpful assistant for Iron Lady Leadership Programs. Provide informative and encouraging responses about leadership development programs."),
+                MessagesPlaceholder(variable_name="history"),
                 ("human", "Question: {question}\n\nContext about our programs: {program_info}\n\nPlease provide a helpful response:")
             ])
             
-            chain = LLMChain(llm=llm, prompt=prompt)
-            program_info = str(get_program_info())
-            response = chain.run(question=question, program_info=program_info)
+            program_info = get_rendered_responses()["program_info"]
+            # The history is sent along but left out of the cache key, so a question asked again later in a
+            # conversation, or in another one, is answered from the cache. The cached answer is the one written
+            # for the first conversation, even if that conversation had gone differently.
+            if stream:
+                return stream_cached(llm, prompt, on_error=llm_error_message, key_without=("history",),
+                                     question=question, program_info=program_info, history=history or [])
+            
+            response = run_cached(llm, prompt, key_without=("history",), question=question, program_info=program_info,
+                                  history=history or [])
             return response
         except Exception as e:
-            return f"I apologize, but I'm having trouble processing your request right now. Please try again later. Error: {str(e)}"
+            return llm_error_message(e)
     else:
         return "I'm sorry, I don't have information about that. Please contact our support team for assistance."
 
 # Function to get mentor information
 def get_mentor_info(mentor_name=None):
     if mentor_name:
-        for mentor in mentor_data:
-            if mentor_name.lower() in mentor["name"].lower():
-                return mentor
-        return None
+        return get_knowledge_base().find_mentor(mentor_name)
     else:
-        return mentor_data
+        return get_knowledge_base().mentors
+
+# Compile the intent table once per server process
+@st.cache_resource(show_spinner=False)
+def get_intent_router():
+    router = IntentRouter(intents)
+    get_metrics().add_collector("intent_router", router.timings)
+    return router
 
 # Function to handle user messages
-def handle_user_message(user_input):
-    # Convert to lowercase for easier matching
-    input_lower = user_input.lower()
-    
-    # Check for program inquiries
-    program_keywords = ["program", "course", "training", "women", "leadership", "executive"]
-    if any(keyword in input_lower for keyword in program_keywords):
-        programs = get_program_info()
-        response = "We offer the following leadership programs:\n\n"
-        for program in programs:
-            response += f"**{program['name']}**\n"
-            response += f"- Duration: {program['duration']}\n"
-            response += f"- Format: {program['format']}\n"
-            response += f"- Certificate: {program['certificate']}\n"
-            response += f"- Mentors: {', '.join(program['mentors'])}\n\n"
-        response += "Would you like more information about any specific program?"
-        return response
-    
-    # Check for mentor inquiries
-    mentor_keywords = ["mentor", "coach", "advisor", "teacher", "instructor"]
-    if any(keyword in input_lower for keyword in mentor_keywords):
-        mentors = get_mentor_info()
-        response = "Our programs are led by experienced mentors:\n\n"
-        for mentor in mentors:
-            response += f"**{mentor['name']}** - {mentor['role']}\n"
-            response += f"- Bio: {mentor['bio']}\n"
-            response += f"- Expertise: {', '.join(mentor['expertise'])}\n\n"
-        response += "Would you like to know more about any specific mentor?"
-        return response
+@timed_response("handle_user_message")
+def handle_user_message(user_input, stream=False, history=None):
+    intent = get_intent_router().route(user_input).intent
     
-    # Check for application process
-    application_keywords = ["apply", "application", "enroll", "register", "join"]
-    if any(keyword in input_lower for keyword in application_keywords):
-        return "To apply for any of our programs, please visit our website and fill out the application form for your program of interest. Our team will review your application and contact you within 5-7 business days. Would you like me to help you with any specific program application?"
+    # Program and mentor listings are rendered once per knowledge base version
+    if intent in ("programs", "mentors"):
+        return get_rendered_responses()[intent]
     
-    # Check for pricing information
-    pricing_keywords = ["cost", "price", "fee", "tuition", "scholarship", "financial"]
-    if any(keyword in input_lower for keyword in pricing_keywords):
-        return "Program fees vary depending on the program length and format. We also offer scholarships based on merit and financial need. For specific pricing information and scholarship opportunities, please visit our website or contact our admissions team. Would you like information about a specific program?"
+    # Application process and pricing have fixed answers
+    if intent in canned_responses:
+        return canned_responses[intent]
     
     # Default to FAQ system
-    return get_faq_answer(user_input)
+    return get_faq_answer(user_input, stream=stream, history=history)
 
 # Function to display chat message
 def display_chat_message(role, message):
@@ -233,43 +265,49 @@ def main():
         st.write("We empower women through leadership development programs designed to build confidence, skills, and networks.")
         
         st.header("Our Programs")
-        for program in get_program_info():
-            with st.expander(program["name"]):
-                st.write(f"**Duration:** {program['duration']}")
-                st.write(f"**Format:** {program['format']}")
-                st.write(f"**Certificate:** {program['certificate']}")
-                st.write(f"**Mentors:** {', '.join(program['mentors'])}")
+        for name, details in get_rendered_responses()["sidebar_programs"]:
+            with st.expander(name):
+                st.markdown(details)
         
         st.header("Quick Links")
         if st.button("View All Programs"):
-            st.session_state.conversation_history.append(("user", "Tell me about all programs"))
-            st.session_state.conversation_history.append(("assistant", handle_user_message("Tell me about all programs")))
+            st.session_state.conversation_history.append("user", "Tell me about all programs")
+            st.session_state.conversation_history.append("assistant", handle_user_message("Tell me about all programs"))
         
         if st.button("Meet Our Mentors"):
-            st.session_state.conversation_history.append(("user", "Tell me about mentors"))
-            st.session_state.conversation_history.append(("assistant", handle_user_message("Tell me about mentors")))
+            st.session_state.conversation_history.append("user", "Tell me about mentors")
+            st.session_state.conversation_history.append("assistant", handle_user_message("Tell me about mentors"))
         
         if st.button("Application Process"):
-            st.session_state.conversation_history.append(("user", "How do I apply?"))
-            st.session_state.conversation_history.append(("assistant", handle_user_message("How do I apply?")))
+            st.session_state.conversation_history.append("user", "How do I apply?")
+            st.session_state.conversation_history.append("assistant", handle_user_message("How do I apply?"))
+        
+        if admin_enabled():
+            render_admin_panel()
     
-    # Display conversation history
-    for role, message in st.session_state.conversation_history:
+    # Display conversation history, reading archived messages back only on request
+    history = st.session_state.conversation_history
+    if history.hidden_count():
+        if st.button(f"Load earlier messages ({history.hidden_count()} more)", key="load_older"):
+            history.load_older(history.window)
+    for role, message in history.visible():
         display_chat_message(role, message)
     
     # User input
     user_input = st.chat_input("Ask about our leadership programs...")
     
     if user_input:
+        # Recent turns within the token budget give the AI context for follow-up questions
+        context = history.context_window(int(os.environ.get("CHAT_CONTEXT_TOKENS", "1500")))
+        
         # Add user message to history
-        st.session_state.conversation_history.append(("user", user_input))
+        st.session_state.conversation_history.append("user", user_input)
         display_chat_message("user", user_input)
         
-        # Get and display assistant response
-        with st.spinner("Thinking..."):
-            response = handle_user_message(user_input)
-            st.session_state.conversation_history.append(("assistant", response))
-            display_chat_message("assistant", response)
+        # Get and display assistant response, showing AI answers as they are generated
+        with st.chat_message("assistant"), timed("chat_answer"):
+            response = write_stream(handle_user_message(user_input, stream=True, history=context))
+            st.session_state.conversation_history.append("assistant", response)
     
     # Add some suggested questions
     st.markdown("---")
@@ -278,21 +316,22 @@ def main():
     
     with col1:
         if st.button("What programs do you offer?"):
-            st.session_state.conversation_history.append(("user", "What programs do you offer?"))
-            st.session_state.conversation_history.append(("assistant", handle_user_message("What programs do you offer?")))
+            st.session_state.conversation_history.append("user", "What programs do you offer?")
+            st.session_state.conversation_history.append("assistant", handle_user_message("What programs do you offer?"))
             st.rerun()
     
     with col2:
         if st.button("Tell me about your mentors"):
-            st.session_state.conversation_history.append(("user", "Tell me about your mentors"))
-            st.session_state.conversation_history.append(("assistant", handle_user_message("Tell me about your mentors")))
+            st.session_state.conversation_history.append("user", "Tell me about your mentors")
+            st.session_state.conversation_history.append("assistant", handle_user_message("Tell me about your mentors"))
             st.rerun()
     
     with col3:
         if st.button("How to apply for programs?"):
-            st.session_state.conversation_history.append(("user", "How to apply for programs?"))
-            st.session_state.conversation_history.append(("assistant", handle_user_message("How to apply for programs?")))
+            st.session_state.conversation_history.append("user", "How to apply for programs?")
+            st.session_state.conversation_history.append("assistant", handle_user_message("How to apply for programs?"))
             st.rerun()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with timed("chatbot_rerun"):
+        main()
\ No newline at end of file
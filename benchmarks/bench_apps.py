@@ -0,0 +1,251 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import ast
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import gc
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Startup and rerun benchmarks for app.py and ai_todo.py.
+# Each scenario runs in a fresh Python process so import and cold start times are real.
+#
+#   python benchmarks/bench_apps.py                      # run everything, write bench_results/<commit>.json
+#   python benchmarks/bench_apps.py --tasks 10,1000 --history 10 --model 100000
+#   python benchmarks/bench_apps.py --compare bench_results/old.json bench_results/new.json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS = {"todo": "ai_todo.py", "chat": "app.py"}
+
+
+# Function to build a stand-in for the Azure model so no scenario touches the network
+def install_fake_llm():
+    from langchain_community.chat_models.fake import FakeListChatModel
+    import llm_client
+    llm_client._llm = FakeListChatModel(responses=["This is a canned benchmark response from the fake model."])
+
+
+# Function to fill a task database with n generated tasks
+def seed_tasks(path, n):
+    from task_store import open_task_store
+    open_task_store("sqlite", path=path).close()
+    priorities, categories, statuses = ["High", "Medium", "Low"], ["Work", "Personal", "Health", "Learning", "Other"], ["Pending", "Completed"]
+    rows = [(f"Task {i}", f"Description for task {i}", priorities[i % 3], categories[i % 5], statuses[i % 2],
+             "2026-01-01 09:00", f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}" if i % 4 else None, None)
+            for i in range(n)]
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO tasks (title, description, priority, category, status, created_at, due_date, completed_at) "
+                     "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+# Function to return the peak resident memory of this process, or None where it cannot be read
+def peak_memory_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+# Function to measure one scenario inside the current (fresh) process
+def run_scenario(app, size, reruns):
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    os.environ["TASK_DB_PATH"] = os.path.join(workdir, "tasks.db")
+    os.environ["LLM_STREAMING"] = "0"
+    if app == "todo":
+        seed_tasks(os.environ["TASK_DB_PATH"], size)
+
+    # Import time covers the modules the app script imports at the top level;
+    # cold start is the first script run after that, so the two add up to the time to first render
+    start = time.perf_counter()
+    import_app_modules(app)
+    import_ms = (time.perf_counter() - start) * 1000
+    from streamlit.testing.v1 import AppTest
+    install_fake_llm()
+
+    at = AppTest.from_file(os.path.join(ROOT, APPS[app]), default_timeout=600)
+    if app == "chat":
+        from chat_history import ConversationHistory
+        history = ConversationHistory(window=int(os.environ.get("CHAT_HISTORY_WINDOW", "50")),
+                                      archive_dir=os.path.join(workdir, "chat_archive"))
+        for turn in range(size):
+            history.append("user" if turn % 2 == 0 else "assistant", f"Message {turn} about our leadership programs")
+        at.session_state.conversation_history = history
+    start = time.perf_counter()
+    at.run()
+    cold_start_ms = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+    rerun_ms = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        rerun_ms.append((time.perf_counter() - start) * 1000)
+
+    result = {
+        "app": app,
+        "size": size,
+        "import_ms": import_ms,
+        "cold_start_ms": cold_start_ms,
+        "rerun_ms_median": statistics.median(rerun_ms),
+        "rerun_ms_p95": percentile(rerun_ms, 0.95),
+    }
+
+    # Another session of the same server process, which reuses the tasks and indexes the first one loaded
+    if app == "todo":
+        start = time.perf_counter()
+        AppTest.from_file(os.path.join(ROOT, APPS[app]), default_timeout=600).run()
+        result["second_session_ms"] = (time.perf_counter() - start) * 1000
+
+    # One chat turn that misses the FAQ index and goes to the (fake) model
+    if app == "chat":
+        start = time.perf_counter()
+        at.chat_input[0].set_value("Could you describe how your alumni network supports graduates?").run()
+        result["chat_turn_ms"] = (time.perf_counter() - start) * 1000
+
+    result["peak_memory_mb"] = peak_memory_mb()
+    return result
+
+
+# Function to compare the memory and filter time of task record dicts (as the store returns them)
+# with Task objects (task_model.py) for the same n tasks
+def run_model_scenario(size, repeats=5):
+    sys.path.insert(0, ROOT)
+    from task_store import SQLiteTaskStore
+    from task_model import Task
+    from task_query import filter_tasks
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_"), "tasks.db")
+    seed_tasks(path, size)
+    store = SQLiteTaskStore(path)
+
+    # Both figures include the title and description strings, which the Task objects keep
+    gc.collect()
+    tracemalloc.start()
+    records = store.load_all()
+    record_bytes = tracemalloc.get_traced_memory()[0]
+    tasks = [Task.from_record(record) for record in records]
+    del records
+    gc.collect()
+    task_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    records = store.load_all()
+    def timed(function):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            function()
+            times.append((time.perf_counter() - start) * 1000)
+        return statistics.median(times)
+
+    return {
+        "app": "model",
+        "size": size,
+        "dict_bytes_per_task": record_bytes / size,
+        "task_bytes_per_task": task_bytes / size,
+        "dict_filter_ms": timed(lambda: [r for r in records if r["status"] == "Pending" and r["priority"] == "High"]),
+        "task_filter_ms": timed(lambda: filter_tasks(tasks, "Pending", "High")),
+    }
+
+
+# Function to run the top-level import statements of an app script.
+# The script itself cannot be imported outside a Streamlit session because it reads st.session_state.
+def import_app_modules(app):
+    with open(os.path.join(ROOT, APPS[app]), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    exec(compile(ast.Module(body=imports, type_ignores=[]), APPS[app], "exec"), {})
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# Function to print the change of every metric between two result files
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = {(r["app"], r["size"]): r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+    for result in new:
+        before = old.get((result["app"], result["size"]))
+        if not before:
+            continue
+        for metric, value in result.items():
+            if metric.endswith(("_ms", "_ms_median", "_ms_p95", "_mb", "_per_task")) and value is not None and before.get(metric):
+                change = (value - before[metric]) / before[metric] * 100
+                print(f"{result['app']:5} {result['size']:>7} {metric:18} {before[metric]:10.1f} -> {value:10.1f} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Streamlit apps headlessly")
+    parser.add_argument("--tasks", default="10,1000,10000,100000", help="task counts for ai_todo.py")
+    parser.add_argument("--history", default="10,100,1000", help="chat history lengths for app.py")
+    parser.add_argument("--model", default="100000", help="task counts for the dict vs Task model comparison")
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--output", help="JSON file for the results (default bench_results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    parser.add_argument("--scenario", nargs=2, metavar=("APP", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    # Child process: run a single scenario and report it on stdout
+    if args.scenario:
+        app, size = args.scenario[0], int(args.scenario[1])
+        print(json.dumps(run_model_scenario(size) if app == "model" else run_scenario(app, size, args.reruns)))
+        return
+
+    scenarios = ([("todo", int(n)) for n in args.tasks.split(",") if n] + [("chat", int(n)) for n in args.history.split(",") if n]
+                 + [("model", int(n)) for n in args.model.split(",") if n])
+    results = []
+    for app, size in scenarios:
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--scenario", app, str(size), "--reruns", str(args.reruns)],
+                                capture_output=True, text=True, check=True)
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        results.append(result)
+        if app == "model":
+            print(f"{app:5} {size:>7}  dict {result['dict_bytes_per_task']:6.0f} B/task  Task {result['task_bytes_per_task']:6.0f} B/task  "
+                  f"filter dict {result['dict_filter_ms']:7.1f} ms  Task {result['task_filter_ms']:7.1f} ms")
+            continue
+        print(f"{app:5} {size:>7}  import {result['import_ms']:7.1f} ms  cold {result['cold_start_ms']:8.1f} ms  rerun p50 {result['rerun_ms_median']:8.1f} ms  "
+              f"p95 {result['rerun_ms_p95']:8.1f} ms  peak {result['peak_memory_mb'] or 0:7.1f} MB")
+
+    commit = git_commit()
+    output_path = args.output or os.path.join(ROOT, "bench_results", f"{commit}.json")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump({"commit": commit, "python": platform.python_version(), "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                   "results": results}, f, indent=2)
+    print(f"Results written to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
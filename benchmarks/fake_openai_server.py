@@ -0,0 +1,106 @@
+import json
+import time
+import random
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the Azure OpenAI chat completions API, for exercising llm_gateway
+# (timeouts, 429/5xx retries, rate limiting, streaming) without network access or cost.
+#
+#   python benchmarks/fake_openai_server.py --port 8089 --latency 0.5 --error-rate 0.2
+#   AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8089 streamlit run app.py
+
+SUGGESTIONS = [
+    {"title": "Outline the presentation", "description": "List the key points and the order to present them in."},
+    {"title": "Draft the weekly report", "description": "Collect this week's numbers and write the summary."},
+    {"title": "Schedule team meetings", "description": "Find slots that work for everyone and send invites."}
+]
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    options = None
+
+    def do_POST(self):
+        if not self.path.split("?")[0].endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.options.latency)
+
+        if random.random() < self.options.error_rate:
+            self._send_json(self.options.error_status, {"error": {"message": "Simulated failure", "code": str(self.options.error_status)}},
+                            {"Retry-After": "1"} if self.options.error_status == 429 else {})
+            return
+
+        text = self._reply(body)
+        if body.get("stream"):
+            self._stream(text)
+        else:
+            self._send_json(200, {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": "gpt-4o",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": len(text.split()), "total_tokens": 10 + len(text.split())}
+            })
+
+    def _reply(self, body):
+        messages = body.get("messages", [])
+        if self.options.reply:
+            return self.options.reply
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            return json.dumps({"tasks": SUGGESTIONS})
+        if any("JSON" in str(message.get("content", "")) for message in messages):
+            return json.dumps(SUGGESTIONS)
+        question = str(messages[-1].get("content", "")) if messages else ""
+        return f"This is a fake answer to: {question[:200]}"
+
+    def _stream(self, text):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for word in text.split(" "):
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": "gpt-4o",
+                "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(self.options.token_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible chat completions server")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before each response starts")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="seconds between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--reply", help="fixed reply text")
+    FakeOpenAIHandler.options = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", FakeOpenAIHandler.options.port), FakeOpenAIHandler)
+    print(f"Fake OpenAI server listening on http://127.0.0.1:{FakeOpenAIHandler.options.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
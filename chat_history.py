@@ -0,0 +1,82 @@
+import os
+import json
+import uuid
+import threading
+
+# Conversation history for the chatbot.
+# Only the most recent turns are kept in memory and rendered; older turns are appended to a
+# JSONL archive on disk and read back a page at a time when the user asks for them.
+
+
+# Function to estimate the number of LLM tokens in a message (about four characters per token)
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+class ConversationHistory:
+    def __init__(self, window=50, archive_dir="chat_archive", session_id=None):
+        self.window = window
+        self.recent = []
+        self.archive_path = os.path.join(archive_dir, f"{session_id or uuid.uuid4().hex}.jsonl")
+        # Byte offset of every archived message, so any of them can be read back without scanning the file
+        self._offsets = []
+        # Archived messages currently shown above the recent window, oldest first.
+        # Always the newest archived messages, so the ones before them are the hidden ones.
+        self.older = []
+        self._lock = threading.Lock()
+
+    def append(self, role, message):
+        with self._lock:
+            self.recent.append((role, message))
+            if len(self.recent) > self.window:
+                overflow = self.recent[:-self.window]
+                self.recent = self.recent[-self.window:]
+                self._archive(overflow)
+                # Once earlier messages are loaded, messages leaving the window stay on screen below them
+                if self.older:
+                    self.older.extend(overflow)
+
+    def _archive(self, messages):
+        os.makedirs(os.path.dirname(self.archive_path) or ".", exist_ok=True)
+        with open(self.archive_path, "ab") as f:
+            for role, message in messages:
+                self._offsets.append(f.tell())
+                f.write((json.dumps({"role": role, "message": message}) + "\n").encode("utf-8"))
+
+    # Number of archived messages that are not loaded yet
+    def hidden_count(self):
+        return len(self._offsets) - len(self.older)
+
+    # Load up to count more archived messages (the newest ones not shown yet) and return them
+    def load_older(self, count):
+        with self._lock:
+            end = self.hidden_count()
+            start = max(0, end - count)
+            if start == end:
+                return []
+            loaded = []
+            with open(self.archive_path, "rb") as f:
+                f.seek(self._offsets[start])
+                for _ in range(end - start):
+                    entry = json.loads(f.readline())
+                    loaded.append((entry["role"], entry["message"]))
+            self.older = loaded + self.older
+            return loaded
+
+    # Messages to render: loaded archived ones followed by the recent window
+    def visible(self):
+        return self.older + self.recent
+
+    # The newest messages that fit in token_budget, oldest first, as (role, text) pairs for a chat prompt
+    def context_window(self, token_budget):
+        selected = []
+        used = 0
+        for role, message in reversed(self.recent):
+            used += estimate_tokens(message)
+            if used > token_budget:
+                break
+            selected.append(("human" if role == "user" else "ai", message))
+        return selected[::-1]
+
+    def __len__(self):
+        return len(self._offsets) + len(self.recent)
@@ -0,0 +1,210 @@
+import heapq
+import itertools
+import collections
+import threading
+import weakref
+from datetime import date, datetime, timedelta
+
+# Due-date index and reminder scheduler for the AI To-Do Manager.
+# Due dates are parsed once when a task is indexed. Pending tasks sit in two min-heaps ordered by due
+# date, one for tasks that were overdue at the last query and one for the rest; tasks move between
+# them as days pass. Overdue and due-soon lists are read in O(k log k) for k results and each change
+# costs O(log n), instead of rescanning every task or walking past the overdue backlog.
+
+
+# Function to turn a date, datetime or "YYYY-MM-DD" string into a date (None stays None)
+def to_date(value):
+    if value is None or isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(value[:10])
+
+
+class DueDateIndex:
+    def __init__(self):
+        # task_id -> due date for every task that has one
+        self._due = {}
+        # task_id -> sequence number of the live heap entry of each pending task
+        self._pending = {}
+        # (due date, task_id, sequence) entries of tasks due before / on or after self._today.
+        # Entries for changed or removed tasks are skipped and later compacted.
+        self._overdue = []
+        self._upcoming = []
+        self._today = date.today()
+        self._sequence = itertools.count()
+        self._stale = 0
+        self._lock = threading.Lock()
+
+    # Index a task's due date; pending tasks take part in overdue/due-soon queries
+    def add(self, task_id, due, pending=True):
+        due = to_date(due)
+        with self._lock:
+            self._discard(task_id)
+            if due is None:
+                return
+            self._due[task_id] = due
+            if pending:
+                self._pending[task_id] = next(self._sequence)
+                heap = self._overdue if due < self._today else self._upcoming
+                heapq.heappush(heap, (due, task_id, self._pending[task_id]))
+
+    def remove(self, task_id):
+        with self._lock:
+            self._discard(task_id)
+
+    # Drop every task, e.g. before indexing a reloaded task list
+    def clear(self):
+        with self._lock:
+            self._due.clear()
+            self._pending.clear()
+            self._overdue = []
+            self._upcoming = []
+            self._stale = 0
+
+    def _discard(self, task_id):
+        self._due.pop(task_id, None)
+        if task_id in self._pending:
+            del self._pending[task_id]
+            self._stale += 1
+            # Rebuild once most of the heaps is stale, which keeps removals O(log n) amortized
+            if self._stale > len(self._pending):
+                self._rebuild(self._today)
+
+    def _rebuild(self, today):
+        entries = [(self._due[t], t, sequence) for t, sequence in self._pending.items()]
+        self._overdue = [entry for entry in entries if entry[0] < today]
+        self._upcoming = [entry for entry in entries if entry[0] >= today]
+        heapq.heapify(self._overdue)
+        heapq.heapify(self._upcoming)
+        self._today = today
+        self._stale = 0
+
+    # Move the tasks that became overdue since the last query; must be called with the lock held
+    def _advance(self, today):
+        if today < self._today:
+            # Asked about an earlier day, e.g. in a test: split the tasks again
+            self._rebuild(today)
+            return
+        while self._upcoming and self._upcoming[0][0] < today:
+            entry = heapq.heappop(self._upcoming)
+            if self._live(entry):
+                heapq.heappush(self._overdue, entry)
+            else:
+                self._stale -= 1
+        self._today = today
+
+    # Return the parsed due date of a task, or None
+    def get(self, task_id):
+        return self._due.get(task_id)
+
+    def _live(self, entry):
+        return self._pending.get(entry[1]) == entry[2]
+
+    # Append (due date, task_id) of live entries of a heap due before `limit`, earliest first, until found
+    # holds `count`. Walks the heap from the root with a second heap of candidates, so it is never sorted as a whole.
+    def _walk(self, heap, limit, count, found):
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier and (count is None or len(found) < count):
+            entry, position = heapq.heappop(frontier)
+            if entry[0] >= limit:
+                break
+            if self._live(entry):
+                found.append(entry[:2])
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+
+    # Return (due date, task_id) of pending tasks due before `limit`, earliest first, at most `count`
+    def due_before(self, limit, count=None):
+        limit = to_date(limit)
+        found = []
+        with self._lock:
+            # Every overdue entry is due before every upcoming one
+            self._walk(self._overdue, limit, count, found)
+            if limit > self._today:
+                self._walk(self._upcoming, limit, count, found)
+        return found
+
+    def overdue(self, today=None, count=None):
+        today = today or date.today()
+        found = []
+        with self._lock:
+            self._advance(today)
+            self._walk(self._overdue, today, count, found)
+        return found
+
+    # Pending tasks due from today up to `days` days ahead
+    def due_soon(self, today=None, days=3, count=None):
+        today = today or date.today()
+        found = []
+        with self._lock:
+            self._advance(today)
+            self._walk(self._upcoming, today + timedelta(days=days + 1), count, found)
+        return found
+
+
+# Background thread that checks a DueDateIndex and records a reminder the first time a task
+# becomes overdue or due soon. Streamlit cannot push to the browser from a thread, so each session
+# shows the reminders recorded since its previous rerun via since(). One scheduler serves every
+# session of the process; a session that starts later gets the tasks due right now from current().
+class ReminderScheduler:
+    def __init__(self, index, titles, interval=60, soon_days=3, history=1000):
+        self._index = weakref.ref(index)
+        # Callable returning the current title of a task ID, or None if it no longer exists
+        self._titles = titles
+        self.interval = interval
+        self.soon_days = soon_days
+        self._notified = set()
+        # (number, text) of the latest reminders; numbers keep counting when old ones are dropped
+        self._reminders = collections.deque(maxlen=history)
+        self._count = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self.check():
+                return
+            self._stop.wait(self.interval)
+
+    # Record reminders for tasks that turned overdue or due soon; returns False once the index is gone
+    def check(self):
+        index = self._index()
+        if index is None:
+            return False
+        due = list(self._due(index))
+        with self._lock:
+            for key, text in due:
+                if key not in self._notified:
+                    self._notified.add(key)
+                    self._reminders.append((self._count, text))
+                    self._count += 1
+        return True
+
+    # Yield ((task_id, due, label), reminder text) for every task that is overdue or due soon today
+    def _due(self, index):
+        today = date.today()
+        for label, entries in (("overdue", index.overdue(today)), ("due soon", index.due_soon(today, self.soon_days))):
+            for due, task_id in entries:
+                title = self._titles(task_id)
+                if title is not None:
+                    yield (task_id, due, label), f"'{title}' is {label} (due {due.isoformat()})"
+
+    # Return (position, reminders) for every task overdue or due soon right now, for a session that just
+    # started. Pass the position to since() on the next rerun.
+    def current(self):
+        with self._lock:
+            position = self._count
+        index = self._index()
+        return position, [text for _, text in self._due(index)] if index is not None else []
+
+    # Return (position, reminders recorded since the given position); pass the position to the next call
+    def since(self, position):
+        with self._lock:
+            return self._count, [text for number, text in self._reminders if number >= position]
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,75 @@
+import re
+import math
+import numpy as np
+
+# TF-IDF retrieval index for the chatbot's FAQ, program and mentor answers.
+# Built once from (text, answer) entries so paraphrased questions can be answered without the LLM.
+
+STOP_WORDS = {
+    "a", "about", "an", "and", "any", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from",
+    "have", "how", "i", "in", "is", "it", "many", "me", "much", "my", "of", "on", "or", "our", "please",
+    "some", "tell", "that", "the", "there", "this", "to", "we", "what", "when", "which", "who", "with",
+    "you", "your"
+}
+
+
+# Function to split text into lowercase word tokens without stop words or plural endings
+def tokenize(text):
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in STOP_WORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+class FAQIndex:
+    def __init__(self, entries, threshold=0.5):
+        self.threshold = threshold
+        self.answers = [answer for _, answer in entries]
+        documents = [tokenize(text) for text, _ in entries]
+
+        self.vocabulary = {}
+        for tokens in documents:
+            for token in tokens:
+                self.vocabulary.setdefault(token, len(self.vocabulary))
+
+        document_frequency = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for tokens in documents:
+            for token in set(tokens):
+                document_frequency[self.vocabulary[token]] += 1
+        self.idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+        # The idf a word would get if it appeared in no entry
+        self.unknown_weight = math.log(1 + len(documents)) + 1
+
+        self.matrix = np.zeros((len(documents), len(self.vocabulary)), dtype=np.float32)
+        for row, tokens in enumerate(documents):
+            self.matrix[row] = self._vectorize(tokens)
+
+    # Turn tokens into an L2-normalized TF-IDF vector.
+    # Words outside the vocabulary have no column, but they still count towards the norm with the weight of
+    # the rarest known word, so a question about something else scores low instead of matching on one shared word.
+    def _vectorize(self, tokens):
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        unknown = 0
+        for token in tokens:
+            column = self.vocabulary.get(token)
+            if column is not None:
+                vector[column] += 1
+            else:
+                unknown += 1
+        vector *= self.idf
+        norm = math.sqrt(float(vector @ vector) + unknown * self.unknown_weight ** 2)
+        return vector / norm if norm else vector
+
+    # Return (answer, score) for the most similar entry, or None if nothing reaches the threshold
+    def match(self, question):
+        if not self.answers:
+            return None
+        scores = self.matrix @ self._vectorize(tokenize(question))
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        return self.answers[best], float(scores[best])
@@ -0,0 +1,63 @@
+import re
+import time
+from collections import namedtuple
+
+# Keyword intent router for the chatbot.
+# All keywords of all intents are compiled into one regex, so a message is scanned once
+# however many intents and keywords there are.
+
+# Endings accepted after a keyword, so "program" also matches "programs" but "join" does not match "joint"
+KEYWORD_SUFFIX = r"(?:s|es|ed|ing|ment)?"
+
+IntentMatch = namedtuple("IntentMatch", ["intent", "score", "scores", "elapsed_ms"])
+
+
+class IntentRouter:
+    # intents is a list of {"name": ..., "keywords": {keyword: weight}} in priority order.
+    # An intent wins when its summed keyword weights reach min_score; ties go to the earlier intent.
+    def __init__(self, intents, min_score=1.0):
+        self.intents = intents
+        self.min_score = min_score
+        self._priority = {intent["name"]: position for position, intent in enumerate(intents)}
+        self._weights = {}
+        for intent in intents:
+            for keyword, weight in intent["keywords"].items():
+                self._weights.setdefault(keyword.lower(), []).append((intent["name"], weight))
+
+        # Longest keywords first so the longest keyword starting at a position wins
+        keywords = sorted(self._weights, key=len, reverse=True)
+        self._pattern = re.compile(r"\b(" + "|".join(re.escape(keyword) for keyword in keywords) + r")" + KEYWORD_SUFFIX + r"\b",
+                                   re.IGNORECASE)
+
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    # Return the best IntentMatch for a message; intent is None when nothing scores high enough
+    def route(self, message):
+        start = time.perf_counter()
+        scores = {}
+        for match in self._pattern.finditer(message):
+            for name, weight in self._weights[match.group(1).lower()]:
+                scores[name] = scores.get(name, 0) + weight
+
+        best = None
+        for name, score in scores.items():
+            if score < self.min_score:
+                continue
+            if best is None or (score, -self._priority[name]) > (scores[best], -self._priority[best]):
+                best = name
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        return IntentMatch(best, scores.get(best, 0), scores, elapsed_ms)
+
+    # Return call count, average and worst routing time in milliseconds
+    def timings(self):
+        return {
+            "calls": self.calls,
+            "avg_ms": self.total_ms / self.calls if self.calls else 0.0,
+            "max_ms": self.max_ms
+        }
@@ -0,0 +1,182 @@
+import os
+import json
+import bisect
+import threading
+import time
+
+# Knowledge base for the Iron Lady chatbot.
+# Programs, FAQs and mentors are read from JSON or YAML files in one directory, validated once per
+# load and indexed by name. Files are checked for changes at most every check_interval seconds and
+# reloaded in place, so catalog updates show up without restarting the server.
+
+# Section name -> {field: expected type} for every entry of that section
+SCHEMA = {
+    "programs": {"name": str, "duration": str, "format": str, "certificate": str, "mentors": list},
+    "faqs": {"question": str, "answer": str},
+    "mentors": {"name": str, "role": str, "bio": str, "expertise": list},
+}
+
+# File extensions tried for each section, in order
+EXTENSIONS = [".json", ".yaml", ".yml"]
+
+
+class KnowledgeBaseError(ValueError):
+    pass
+
+
+# Function to read one data file, YAML support needs PyYAML
+def read_file(path):
+    with open(path, encoding="utf-8") as file:
+        if path.endswith(".json"):
+            return json.load(file)
+        try:
+            import yaml
+        except ImportError:
+            raise KnowledgeBaseError(f"{path}: PyYAML is required to read YAML files")
+        try:
+            return yaml.safe_load(file)
+        except yaml.YAMLError as e:
+            # e.g. a file that is only partly saved
+            raise KnowledgeBaseError(f"{path}: {e}") from e
+
+
+# Function to check a section's entries against SCHEMA, collecting every problem found
+def validate(section, entries):
+    if not isinstance(entries, list):
+        return [f"{section}: expected a list of entries"]
+    problems = []
+    key = "question" if section == "faqs" else "name"
+    seen = set()
+    for position, entry in enumerate(entries, start=1):
+        if not isinstance(entry, dict):
+            problems.append(f"{section} entry {position}: expected an object")
+            continue
+        for field, expected in SCHEMA[section].items():
+            if not isinstance(entry.get(field), expected):
+                problems.append(f"{section} entry {position}: '{field}' must be a {expected.__name__}")
+        name = str(entry.get(key, "")).casefold()
+        if name in seen:
+            problems.append(f"{section} entry {position}: duplicate {key} '{entry[key]}'")
+        seen.add(name)
+    if section == "programs" and not problems:
+        for entry in entries:
+            if not all(isinstance(mentor, str) for mentor in entry["mentors"]):
+                problems.append(f"programs: mentors of '{entry['name']}' must be names")
+    return problems
+
+
+# Name lookups over a list of entries: exact name first, then the first entry whose name contains
+# the query starting at a word boundary (found through a sorted word list instead of a scan)
+class NameIndex:
+    def __init__(self, entries):
+        self.entries = entries
+        self.names = {entry["name"].casefold(): entry for entry in entries}
+        self.words = sorted((word, position) for position, entry in enumerate(entries)
+                            for word in set(entry["name"].casefold().split()))
+
+    def find(self, query):
+        key = " ".join(query.casefold().split())
+        if key in self.names:
+            return self.names[key]
+        if not key:
+            return None
+        first = key.split()[0]
+        positions = set()
+        index = bisect.bisect_left(self.words, (first,))
+        while index < len(self.words) and self.words[index][0].startswith(first):
+            positions.add(self.words[index][1])
+            index += 1
+        for position in sorted(positions):
+            if key in self.entries[position]["name"].casefold():
+                return self.entries[position]
+        return None
+
+
+# One validated, read-only version of the knowledge base
+class KnowledgeBase:
+    def __init__(self, programs, faqs, mentors, version=1):
+        self.programs = programs
+        self.faqs = faqs
+        self.mentors = mentors
+        self.version = version
+        self.program_index = NameIndex(programs)
+        self.mentor_index = NameIndex(mentors)
+
+    def find_program(self, name):
+        return self.program_index.find(name)
+
+    def find_mentor(self, name):
+        return self.mentor_index.find(name)
+
+
+class KnowledgeBaseLoader:
+    def __init__(self, directory, check_interval=2.0):
+        self.directory = directory
+        self.check_interval = check_interval
+        # Problem that kept the latest files from loading; the previous version stays in use
+        self.last_error = None
+        self._knowledge_base = None
+        self._signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    # Function to find the data file of each section
+    def _paths(self):
+        paths = {}
+        for section in SCHEMA:
+            for extension in EXTENSIONS:
+                path = os.path.join(self.directory, section + extension)
+                if os.path.exists(path):
+                    paths[section] = path
+                    break
+            else:
+                raise KnowledgeBaseError(f"No {section} file in {self.directory}")
+        return paths
+
+    # Modification time and size of every data file, changes when any file is edited
+    def _file_signature(self, paths):
+        signature = []
+        for section, path in paths.items():
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    # Read and validate every file; raises KnowledgeBaseError unless a usable version is kept
+    def reload(self):
+        with self._lock:
+            self._checked_at = time.monotonic()
+            signature = None
+            try:
+                paths = self._paths()
+                signature = self._file_signature(paths)
+                data = {section: read_file(path) for section, path in paths.items()}
+                problems = [problem for section, entries in data.items() for problem in validate(section, entries)]
+                if problems:
+                    raise KnowledgeBaseError("; ".join(problems))
+            except (OSError, ValueError) as e:
+                self.last_error = str(e)
+                if self._knowledge_base is None:
+                    raise KnowledgeBaseError(self.last_error) from e
+                # Do not retry the same broken files on every check
+                if signature is not None:
+                    self._signature = signature
+                return self._knowledge_base
+            version = self._knowledge_base.version + 1 if self._knowledge_base else 1
+            self._knowledge_base = KnowledgeBase(data["programs"], data["faqs"], data["mentors"], version)
+            self._signature = signature
+            self.last_error = None
+            return self._knowledge_base
+
+    # Return the current knowledge base, reloading it first if a file changed
+    def current(self):
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            try:
+                changed = self._file_signature(self._paths()) != self._signature
+            except (OSError, KnowledgeBaseError) as e:
+                self.last_error = str(e)
+                changed = False
+            if changed:
+                return self.reload()
+            self._checked_at = time.monotonic()
+        return self._knowledge_base
@@ -0,0 +1,162 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from llm_gateway import get_gateway
+from metrics import get_metrics
+
+# Response cache shared by the chatbot and the To-Do Manager for LLM calls.
+# Entries live in an in-process LRU and, when LLM_CACHE_PATH is set, in a SQLite file that outlives restarts.
+
+
+# Function to normalize prompt text so trivially different prompts share an entry
+def normalize_prompt(text):
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+# Function to build a cache key from (role, content) messages and the model parameters
+def make_cache_key(messages, **params):
+    payload = json.dumps({
+        "messages": [[role, normalize_prompt(content)] for role, content in messages],
+        "params": params
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    def __init__(self, max_entries=1024, ttl=3600, disk_path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute("CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+            self._disk.commit()
+
+    # Return the cached response for a key, or None on a miss
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] > now:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry:
+                del self._memory[key]
+
+            if self._disk is not None:
+                row = self._disk.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row and row[1] > now:
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._disk is not None:
+                self._disk.execute("INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                                   (key, value, expires_at))
+                self._disk.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+                self._disk.commit()
+
+    # Store in the LRU tier, evicting the least recently used entry when full (caller holds the lock)
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM llm_cache")
+                self._disk.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._memory)
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+# Function to get the process-wide cache configured from the environment
+def get_llm_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache(
+                max_entries=int(os.environ.get("LLM_CACHE_SIZE", "1024")),
+                ttl=float(os.environ.get("LLM_CACHE_TTL", "3600")),
+                disk_path=os.environ.get("LLM_CACHE_PATH") or None
+            )
+            get_metrics().add_collector("llm_cache", _cache.stats)
+        return _cache
+
+
+# Function to return the model settings that change a response, for use in cache keys.
+# Models wrapped with llm.bind(...) also contribute their bound arguments, e.g. JSON mode.
+def model_params(llm):
+    model = getattr(llm, "bound", llm)
+    params = {name: getattr(model, name, None) for name in ("deployment_name", "model_name", "temperature")}
+    if model is not llm:
+        params["bound"] = getattr(llm, "kwargs", {})
+    return params
+
+
+# Function to build the cache key for a chat prompt template filled with inputs.
+# key_without names message-list inputs (MessagesPlaceholder) that are left out of the key, e.g. chat history.
+def prompt_cache_key(llm, prompt, inputs, key_without=()):
+    messages = prompt.format_messages(**{**inputs, **{name: [] for name in key_without}})
+    return make_cache_key([(message.type, message.content) for message in messages], **model_params(llm))
+
+
+# Function to fill a chat prompt and get the response through the cache and the LLM gateway.
+# Failed calls raise and are never cached. key_without is passed on to prompt_cache_key.
+def run_cached(llm, prompt, cache=None, key_without=(), **inputs):
+    cache = cache or get_llm_cache()
+    key = prompt_cache_key(llm, prompt, inputs, key_without)
+    response = cache.get(key)
+    if response is None:
+        response = get_gateway().complete(llm, prompt.format_messages(**inputs))
+        cache.set(key, response)
+    return response
+
+
+# Function to fill a chat prompt with each inputs dict and get all responses through the cache,
+# sending the misses to the LLM gateway concurrently. Returns one response or Exception per inputs dict.
+def run_cached_many(llm, prompt, inputs_list, cache=None):
+    cache = cache or get_llm_cache()
+    keys = [prompt_cache_key(llm, prompt, inputs) for inputs in inputs_list]
+    responses = [cache.get(key) for key in keys]
+    missing = [position for position, response in enumerate(responses) if response is None]
+    if missing:
+        batch = [prompt.format_messages(**inputs_list[position]) for position in missing]
+        for position, response in zip(missing, get_gateway().complete_many(llm, batch)):
+            if not isinstance(response, Exception):
+                cache.set(keys[position], response)
+            responses[position] = response
+    return responses
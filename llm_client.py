@@ -0,0 +1,34 @@
+import os
+import threading
+
+# Shared Azure OpenAI chat model for both apps.
+# The client is created on first use and then reused by every session and rerun in the process,
+# so its HTTP connection pool stays warm and langchain is only imported when a page calls the model.
+
+_llm = None
+_lock = threading.Lock()
+
+
+# Function to get the shared chat model, creating it on first use. Raises if it cannot be created.
+def get_llm():
+    global _llm
+    with _lock:
+        if _llm is None:
+            from langchain_openai import AzureChatOpenAI
+            _llm = AzureChatOpenAI(
+                azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+                api_key=os.environ["AZURE_OPENAI_API_KEY"],
+                api_version=os.environ["AZURE_OPENAI_API_VERSION"],
+                deployment_name=os.environ["AZURE_OPENAI_DEPLOYMENT"],
+                temperature=0.7,
+                # Retries and timeouts are handled by llm_gateway
+                max_retries=0
+            )
+        return _llm
+
+
+# Function to drop the shared model, e.g. after the Azure settings change
+def reset_llm():
+    global _llm
+    with _lock:
+        _llm = None
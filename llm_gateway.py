@@ -0,0 +1,226 @@
+import os
+import time
+import queue
+import random
+import asyncio
+import threading
+from functools import lru_cache
+from chat_history import estimate_tokens
+from metrics import get_metrics
+
+# Async gateway for every LLM call made by the apps.
+# Requests run on one background event loop per process, behind a bounded concurrency semaphore
+# and a token-bucket rate limiter, with per-request timeouts and exponential backoff on 429/5xx.
+# Streamlit scripts are synchronous, so complete()/complete_many()/stream() block on that loop.
+# Every request's latency, token counts and cost are recorded in the metrics registry.
+
+
+# Refills at `rate` tokens per second up to `capacity`; acquire() waits until a token is available
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# Function to decide whether a failed request is worth retrying
+def is_retryable(error):
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    # Connection failures from the openai client carry no status code
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+# Function to read the server's Retry-After hint in seconds, if it sent one
+def retry_after(error):
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+# Function to return a langchain callback class that copies the token usage reported by the API into a dict.
+# Created on first use so langchain is only imported once a model is called.
+@lru_cache(maxsize=None)
+def usage_callback_class():
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class UsageCallback(BaseCallbackHandler):
+        def __init__(self):
+            self.usage = {}
+
+        def on_llm_end(self, response, **kwargs):
+            self.usage.update((response.llm_output or {}).get("token_usage") or {})
+
+    return UsageCallback
+
+
+# Function to name the model of a (possibly bound) chat model in metrics
+def model_name(llm):
+    model = getattr(llm, "bound", llm)
+    return getattr(model, "deployment_name", None) or getattr(model, "model_name", None) or "unknown"
+
+
+# Function to record one request in the metrics registry. Token counts come from the API's usage report,
+# or are estimated from the text when it sent none (e.g. for streamed responses).
+def record_request(llm, kind, start, messages, usage, response_text, error=None):
+    prompt_tokens = usage.get("prompt_tokens")
+    completion_tokens = usage.get("completion_tokens")
+    estimated = prompt_tokens is None or completion_tokens is None
+    if estimated:
+        prompt_tokens = sum(estimate_tokens(str(message.content)) for message in messages)
+        completion_tokens = estimate_tokens(response_text) if response_text else 0
+    get_metrics().record_llm_call(model_name(llm), kind, time.perf_counter() - start, prompt_tokens, completion_tokens,
+                                  estimated=estimated, error=type(error).__name__ if error else None)
+
+
+class LLMGateway:
+    def __init__(self, max_concurrency=4, requests_per_second=5.0, burst=10, timeout=60.0,
+                 max_retries=4, backoff_base=0.5, backoff_max=20.0):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retries = 0
+        self.failures = 0
+
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="llm-gateway", daemon=True).start()
+        # asyncio primitives must be created on the loop that uses them
+        self._semaphore, self._bucket = self._call(self._create_limits(max_concurrency, requests_per_second, burst))
+
+    async def _create_limits(self, max_concurrency, requests_per_second, burst):
+        return asyncio.Semaphore(max_concurrency), TokenBucket(requests_per_second, burst)
+
+    # Run a coroutine on the gateway loop and wait for its result
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _backoff(self, attempt, error):
+        delay = retry_after(error)
+        if delay is None:
+            delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+        return delay
+
+    # Send chat messages and return the response text
+    async def acomplete(self, llm, messages):
+        start = time.perf_counter()
+        callback = usage_callback_class()()
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self._bucket.acquire()
+                try:
+                    response = await asyncio.wait_for(llm.ainvoke(messages, config={"callbacks": [callback]}), self.timeout)
+                    record_request(llm, "complete", start, messages, callback.usage, response.content)
+                    return response.content
+                except Exception as e:
+                    if attempt == self.max_retries or not is_retryable(e):
+                        self.failures += 1
+                        record_request(llm, "complete", start, messages, {}, "", error=e)
+                        raise
+                    self.retries += 1
+                    await asyncio.sleep(self._backoff(attempt, e))
+
+    # Yield response text as it is generated. Retries only happen before the first token;
+    # the timeout applies to the wait for each chunk.
+    async def astream(self, llm, messages):
+        start = time.perf_counter()
+        callback = usage_callback_class()()
+        parts = []
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self._bucket.acquire()
+                try:
+                    chunks = llm.astream(messages, config={"callbacks": [callback]}).__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                        except StopAsyncIteration:
+                            record_request(llm, "stream", start, messages, callback.usage, "".join(parts))
+                            return
+                        if chunk.content:
+                            if not parts:
+                                get_metrics().observe("llm_first_token_seconds", time.perf_counter() - start, model=model_name(llm))
+                            parts.append(chunk.content)
+                            yield chunk.content
+                except Exception as e:
+                    if parts or attempt == self.max_retries or not is_retryable(e):
+                        self.failures += 1
+                        record_request(llm, "stream", start, messages, callback.usage, "".join(parts), error=e)
+                        raise
+                    self.retries += 1
+                    await asyncio.sleep(self._backoff(attempt, e))
+
+    # Send several message lists concurrently; failed requests come back as exception objects
+    async def acomplete_many(self, llm, batch):
+        return await asyncio.gather(*(self.acomplete(llm, messages) for messages in batch), return_exceptions=True)
+
+    def complete(self, llm, messages):
+        return self._call(self.acomplete(llm, messages))
+
+    def complete_many(self, llm, batch):
+        return self._call(self.acomplete_many(llm, batch))
+
+    # Synchronous generator over astream(), fed through a queue from the gateway loop
+    def stream(self, llm, messages):
+        chunks = queue.Queue()
+        done = object()
+
+        async def produce():
+            try:
+                async for text in self.astream(llm, messages):
+                    chunks.put(text)
+            except Exception as e:
+                chunks.put(e)
+            finally:
+                chunks.put(done)
+
+        future = asyncio.run_coroutine_threadsafe(produce(), self._loop)
+        try:
+            while True:
+                item = chunks.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # The reader stopped early, e.g. the Streamlit script was rerun
+            future.cancel()
+
+    def stats(self):
+        return {"retries": self.retries, "failures": self.failures}
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+# Function to get the process-wide gateway configured from the environment
+def get_gateway():
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway(
+                max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY", "4")),
+                requests_per_second=float(os.environ.get("LLM_RATE_LIMIT", "5")),
+                burst=int(os.environ.get("LLM_BURST", "10")),
+                timeout=float(os.environ.get("LLM_TIMEOUT", "60")),
+                max_retries=int(os.environ.get("LLM_MAX_RETRIES", "4"))
+            )
+            get_metrics().add_collector("llm_gateway", _gateway.stats)
+        return _gateway
@@ -0,0 +1,67 @@
+import os
+import streamlit as st
+from llm_cache import get_llm_cache, prompt_cache_key
+from llm_gateway import get_gateway
+
+# Token streaming for LLM responses in the Streamlit apps.
+# Set LLM_STREAMING=0 to always wait for the full completion instead.
+
+
+# Function to check whether streaming is enabled
+def streaming_enabled():
+    return os.environ.get("LLM_STREAMING", "1") != "0"
+
+
+# Function to yield the response to a chat prompt as it is generated.
+# Cached responses are yielded in one piece and completed streams are added to the cache.
+# If streaming fails before the first token the full completion is requested instead.
+# on_error turns an exception into a final message, otherwise it is raised.
+# key_without is passed on to prompt_cache_key.
+def stream_cached(llm, prompt, cache=None, on_error=None, key_without=(), **inputs):
+    cache = cache or get_llm_cache()
+    try:
+        key = prompt_cache_key(llm, prompt, inputs, key_without)
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        messages = prompt.format_messages(**inputs)
+        parts = []
+        if streaming_enabled():
+            try:
+                for text in get_gateway().stream(llm, messages):
+                    parts.append(text)
+                    yield text
+            except Exception:
+                if parts:
+                    raise
+        if not parts:
+            parts.append(get_gateway().complete(llm, messages))
+            yield parts[0]
+        cache.set(key, "".join(parts))
+    except Exception as e:
+        if on_error is None:
+            raise
+        yield on_error(e)
+
+
+# Function to render a response that is either a string or a token stream and return the full text.
+# element is the Streamlit element the text is shown in, e.g. "markdown" or "info".
+def write_stream(response, element="markdown"):
+    if isinstance(response, str):
+        getattr(st, element)(response)
+        return response
+
+    if element == "markdown" and hasattr(st, "write_stream"):
+        return st.write_stream(response)
+
+    # Streamlit versions before st.write_stream, or a styled element: redraw a placeholder per token
+    placeholder = st.empty()
+    getattr(placeholder, element)("▌")
+    text = ""
+    for token in response:
+        text += token
+        getattr(placeholder, element)(text + "▌")
+    getattr(placeholder, element)(text)
+    return text
@@ -0,0 +1,357 @@
+import os
+import json
+import time
+import bisect
+import functools
+import threading
+from contextlib import contextmanager
+
+# Process-wide instrumentation for both apps.
+# Timers record latency histograms with p50/p95/p99 estimates, LLM calls add token counts and cost,
+# and collectors pull the counters other components already keep, such as cache hit ratios.
+# Everything can be exported as Prometheus text over HTTP (METRICS_PORT) and/or appended to a JSONL
+# file (METRICS_JSONL_PATH), and shown in an in-app admin panel (METRICS_ADMIN=1).
+
+# Histogram bucket upper bounds in seconds: 0.1 ms to about 2 minutes, 25% apart
+BUCKETS = tuple(0.0001 * 1.25 ** i for i in range(64))
+
+# USD per million tokens for prompt (input) and completion (output) tokens, by default GPT-4o's prices
+DEFAULT_PRICES = (2.5, 10.0)
+
+
+class Histogram:
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        # One count per bucket plus one for values above the last bound
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    # Estimate a quantile (0-1) by interpolating inside the bucket that contains it, capped at the largest value
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for position, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[position - 1] if position else 0.0
+                upper = self.bounds[position] if position < len(self.bounds) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / count)
+            seen += count
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max
+        }
+
+
+# Function to estimate the cost of an LLM call in USD
+def call_cost(prompt_tokens, completion_tokens, prices=DEFAULT_PRICES):
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+class MetricsRegistry:
+    def __init__(self, prices=DEFAULT_PRICES):
+        self.prices = prices
+        self._lock = threading.Lock()
+        # (name, sorted label pairs) -> Histogram / number
+        self._histograms = {}
+        self._counters = {}
+        # name -> function returning {key: number}, read at export time
+        self._collectors = {}
+        # Functions called with every LLM call record, e.g. the JSONL exporter
+        self._listeners = []
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    # Time a block or, used as a decorator, every call of a function. Failed calls are timed too.
+    @contextmanager
+    def timer(self, operation):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("operation_seconds", time.perf_counter() - start, operation=operation)
+
+    # Record one LLM request: its latency, token counts and cost.
+    # estimated is True when the token counts were estimated from the text instead of reported by the API.
+    def record_llm_call(self, model, kind, seconds, prompt_tokens, completion_tokens, estimated=False, error=None):
+        cost = call_cost(prompt_tokens, completion_tokens, self.prices)
+        self.observe("llm_request_seconds", seconds, model=model, kind=kind)
+        self.increment("llm_requests_total", model=model, kind=kind, status="error" if error else "ok")
+        self.increment("llm_tokens_total", prompt_tokens, model=model, type="prompt")
+        self.increment("llm_tokens_total", completion_tokens, model=model, type="completion")
+        self.increment("llm_cost_usd_total", cost, model=model)
+        if estimated:
+            self.increment("llm_estimated_token_calls_total", model=model)
+        record = {
+            "event": "llm_call",
+            "time": time.time(),
+            "model": model,
+            "kind": kind,
+            "seconds": round(seconds, 6),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "estimated_tokens": estimated,
+            "cost_usd": round(cost, 8),
+            "error": error
+        }
+        for listener in list(self._listeners):
+            listener(record)
+
+    def add_collector(self, name, collect):
+        with self._lock:
+            self._collectors[name] = collect
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    # Return all metrics as plain data: histogram summaries, counters and collected values
+    def snapshot(self):
+        with self._lock:
+            histograms = [(name, dict(labels), histogram.summary()) for (name, labels), histogram in self._histograms.items()]
+            counters = [(name, dict(labels), value) for (name, labels), value in self._counters.items()]
+            collectors = list(self._collectors.items())
+        collected = {}
+        for name, collect in collectors:
+            try:
+                collected[name] = collect()
+            except Exception as e:
+                collected[name] = {"error": str(e)}
+        return {
+            "histograms": [{"name": name, "labels": labels, **summary} for name, labels, summary in histograms],
+            "counters": [{"name": name, "labels": labels, "value": value} for name, labels, value in counters],
+            "collected": collected
+        }
+
+    # Return all metrics in the Prometheus text exposition format
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            histograms = sorted((key, list(histogram.counts), histogram.count, histogram.sum)
+                                for key, histogram in self._histograms.items())
+            counters = sorted(self._counters.items())
+            collectors = list(self._collectors.items())
+
+        typed = set()
+        for (name, labels), counts, count, total in histograms:
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS, counts):
+                cumulative += bucket_count
+                # Empty leading buckets carry no information, skip them to keep the output short
+                if cumulative:
+                    lines.append(f"{name}_bucket{_labels(labels, le=f'{bound:.6g}')} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels, le='+Inf')} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {total}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_labels(labels)} {value}")
+
+        for collector, collect in collectors:
+            try:
+                values = collect()
+            except Exception:
+                continue
+            for key, value in values.items():
+                if isinstance(value, (int, float)):
+                    lines.append(f"# TYPE {collector}_{key} gauge")
+                    lines.append(f"{collector}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Function to format Prometheus labels, e.g. {model="gpt-4o",le="0.5"}
+def _labels(pairs, **extra):
+    items = list(pairs) + list(extra.items())
+    if not items:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in items)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(items, escaped)) + "}"
+
+
+# Serves the registry as Prometheus text at http://<host>:<port>/metrics from a daemon thread
+def start_http_server(registry, port, host="127.0.0.1"):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+# Appends every LLM call record, and a snapshot of all metrics every `interval` seconds, to a JSONL file.
+# Records are buffered and written by a daemon thread, so request threads never wait on the disk.
+class JSONLExporter:
+    def __init__(self, registry, path, interval=60.0):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._pending = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        registry.add_listener(self.emit)
+        self._thread = threading.Thread(target=self._run, name="metrics-jsonl", daemon=True)
+        self._thread.start()
+
+    def emit(self, record):
+        with self._lock:
+            self._pending.append(record)
+
+    # Write buffered records, followed by a snapshot when snapshot=True
+    def flush(self, snapshot=False):
+        with self._lock:
+            records, self._pending = self._pending, []
+        if snapshot:
+            records.append({"event": "snapshot", "time": time.time(), **self.registry.snapshot()})
+        if records:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write("".join(json.dumps(record) + "\n" for record in records))
+
+    def _run(self):
+        last_snapshot = time.monotonic()
+        # Call records are written every second, snapshots every interval
+        while not self._stopped.wait(min(1.0, self.interval)):
+            due = time.monotonic() - last_snapshot >= self.interval
+            if due:
+                last_snapshot = time.monotonic()
+            try:
+                self.flush(snapshot=due)
+            except OSError:
+                pass
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self.flush(snapshot=True)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+# Function to get the process-wide registry, starting the exporters configured in the environment
+def get_metrics():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            prices = os.environ.get("LLM_TOKEN_PRICES")
+            registry = MetricsRegistry(tuple(float(price) for price in prices.split(",")) if prices else DEFAULT_PRICES)
+            if os.environ.get("METRICS_PORT"):
+                registry.http_server = start_http_server(registry, int(os.environ["METRICS_PORT"]))
+            if os.environ.get("METRICS_JSONL_PATH"):
+                registry.jsonl_exporter = JSONLExporter(registry, os.environ["METRICS_JSONL_PATH"],
+                                                        interval=float(os.environ.get("METRICS_JSONL_INTERVAL", "60")))
+            _registry = registry
+        return _registry
+
+
+# Function to time a block or function under the process-wide registry, e.g. @timed("summarize_tasks").
+# Only for functions that return plain values: a returned generator would stop the clock before it is read.
+def timed(operation):
+    return get_metrics().timer(operation)
+
+
+# Decorator for functions that return either a string or a token stream, e.g. @timed_response("get_faq_answer").
+# A string is timed like @timed; a stream is timed until it has been read to the end or closed.
+def timed_response(operation):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                response = function(*args, **kwargs)
+            except BaseException:
+                get_metrics().observe("operation_seconds", time.perf_counter() - start, operation=operation)
+                raise
+            if isinstance(response, str) or not hasattr(response, "__next__"):
+                get_metrics().observe("operation_seconds", time.perf_counter() - start, operation=operation)
+                return response
+            return _timed_stream(response, operation, start)
+        return wrapper
+    return decorator
+
+
+# Function to pass a stream through and record the time from the call that created it until it ends
+def _timed_stream(stream, operation, start):
+    try:
+        yield from stream
+    finally:
+        get_metrics().observe("operation_seconds", time.perf_counter() - start, operation=operation)
+
+
+# Function to check whether the in-app admin panel is enabled
+def admin_enabled():
+    return os.environ.get("METRICS_ADMIN", "0") == "1"
+
+
+# Function to show the metrics in a Streamlit expander: latency percentiles, LLM usage and collected stats
+def render_admin_panel():
+    import streamlit as st
+    snapshot = get_metrics().snapshot()
+    with st.expander("📈 Metrics"):
+        if snapshot["histograms"]:
+            st.markdown("**Latency (ms)**")
+            st.dataframe([
+                {
+                    "metric": histogram["labels"].get("operation") or f"{histogram['name']} {histogram['labels']}",
+                    "calls": histogram["count"],
+                    "p50": round(histogram["p50"] * 1000, 1),
+                    "p95": round(histogram["p95"] * 1000, 1),
+                    "p99": round(histogram["p99"] * 1000, 1)
+                }
+                for histogram in sorted(snapshot["histograms"], key=lambda histogram: -histogram["sum"])
+            ], hide_index=True)
+        if snapshot["counters"]:
+            st.markdown("**Counters**")
+            st.dataframe([
+                {"metric": counter["name"], "labels": ", ".join(f"{k}={v}" for k, v in counter["labels"].items()),
+                 "value": round(counter["value"], 6)}
+                for counter in sorted(snapshot["counters"], key=lambda counter: counter["name"])
+            ], hide_index=True)
+        for name, values in snapshot["collected"].items():
+            st.markdown(f"**{name}**")
+            st.json(values)
@@ -0,0 +1,75 @@
+import json
+
+# Structured output helpers for LLM responses that contain JSON.
+# JSONObjectStreamParser is fed text as it streams in and hands back every object that sits inside a
+# JSON array as soon as its closing brace arrives, ignoring any prose around the JSON.
+
+
+class JSONObjectStreamParser:
+    def __init__(self):
+        self._buffer = ""
+        self._position = 0
+        # Open containers ("{" or "[") around the current position
+        self._stack = []
+        self._in_string = False
+        self._escaped = False
+        # Buffer index and stack depth of the object currently being collected
+        self._object_start = None
+        self._object_depth = None
+
+    # Add a piece of text and return the list of objects completed by it
+    def feed(self, text):
+        self._buffer += text
+        found = []
+        while self._position < len(self._buffer):
+            char = self._buffer[self._position]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"' and self._stack:
+                self._in_string = True
+            elif char in "{[":
+                if char == "{" and self._object_start is None and self._stack and self._stack[-1] == "[":
+                    self._object_start = self._position
+                    self._object_depth = len(self._stack)
+                self._stack.append(char)
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                if self._object_start is not None and len(self._stack) == self._object_depth:
+                    found.extend(self._close_object())
+            self._position += 1
+        self._trim()
+        return found
+
+    def _close_object(self):
+        raw = self._buffer[self._object_start:self._position + 1]
+        self._object_start = None
+        try:
+            return [json.loads(raw)]
+        except json.JSONDecodeError:
+            return []
+
+    # Drop text that can no longer be part of an object, so the buffer stays small
+    def _trim(self):
+        keep_from = self._object_start if self._object_start is not None else self._position
+        self._buffer = self._buffer[keep_from:]
+        if self._object_start is not None:
+            self._object_start = 0
+        self._position -= keep_from
+
+
+# Function to check a task suggestion against the expected schema and return a clean copy, or None
+def validate_suggestion(suggestion, max_title=200, max_description=2000):
+    if not isinstance(suggestion, dict):
+        return None
+    title = suggestion.get("title")
+    description = suggestion.get("description", "")
+    if not isinstance(title, str) or not title.strip():
+        return None
+    if not isinstance(description, str):
+        description = "" if description is None else str(description)
+    return {"title": title.strip()[:max_title], "description": description.strip()[:max_description]}
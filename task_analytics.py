@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from task_model import Category, Priority, Status
+
+# Task analytics for the statistics panel.
+# Tasks are converted once into a columnar DataFrame (categorical dtypes, timestamps) and every
+# metric is computed with vectorized pandas/NumPy operations. TaskAnalytics caches the results until
+# the task set changes.
+
+
+# Function to build the columnar view of the tasks (Task objects).
+# The enum values are used directly as categorical codes, so no labels are compared or parsed.
+def build_frame(tasks):
+    tasks = list(tasks)
+    columns = {}
+    for field, choices in (("priority", Priority), ("status", Status), ("category", Category)):
+        codes = np.fromiter((getattr(task, field) for task in tasks), dtype=np.int8, count=len(tasks))
+        columns[field] = pd.Categorical.from_codes(codes, categories=choices.labels())
+    for field in ("created_at", "completed_at", "due_date"):
+        columns[field] = pd.to_datetime([getattr(task, field) for task in tasks])
+    columns["id"] = [task.id for task in tasks]
+    return pd.DataFrame(columns)
+
+
+# Function to compute the headline numbers: completion rate and overdue / due-soon counts
+def summarize(frame, today, soon_days=3):
+    completed = frame["status"] == "Completed"
+    pending_due = frame["due_date"].where(~completed)
+    return {
+        "total": len(frame),
+        "completion_rate": float(completed.mean()) if len(frame) else 0.0,
+        "overdue": int((pending_due < today).sum()),
+        "due_soon": int(((pending_due >= today) & (pending_due <= today + pd.Timedelta(days=soon_days))).sum())
+    }
+
+
+# Function to return time-to-complete percentiles in hours, e.g. {"p50": 5.0, "p90": 30.0, "p99": 90.0}
+def completion_time_percentiles(frame, percentiles=(50, 90, 99)):
+    hours = ((frame["completed_at"] - frame["created_at"]).dt.total_seconds() / 3600).dropna().to_numpy()
+    if not len(hours):
+        return {}
+    values = np.percentile(hours, percentiles)
+    return {f"p{p}": float(value) for p, value in zip(percentiles, values)}
+
+
+# Function to return the share of completed tasks per value of a categorical field
+def completion_by(frame, field):
+    completed = (frame["status"] == "Completed").astype(float)
+    return completed.groupby(frame[field], observed=True).mean()
+
+
+# Function to return the number of open tasks at the end of each of the last `days` days.
+# Open tasks on a day = tasks created by then - tasks completed by then, found by binary search.
+def burndown(frame, today, days=30):
+    day_ends = pd.date_range(end=today, periods=days, freq="D") + pd.Timedelta(days=1)
+    created = np.sort(frame["created_at"].dropna().to_numpy())
+    completed = np.sort(frame["completed_at"].dropna().to_numpy())
+    bounds = day_ends.to_numpy()
+    open_tasks = np.searchsorted(created, bounds, side="left") - np.searchsorted(completed, bounds, side="left")
+    return pd.Series(open_tasks, index=day_ends - pd.Timedelta(days=1), name="Open tasks")
+
+
+class TaskAnalytics:
+    def __init__(self):
+        # ((version, day), report) of the last report, replaced as a whole so sessions in other threads
+        # never see a report paired with another version
+        self._cached = None
+
+    # Return the analytics report, rebuilding it only when version (the task set's change counter) moved
+    # or the day changed, since overdue counts depend on today's date
+    def report(self, tasks, version, burndown_days=30):
+        today = pd.Timestamp(datetime.now().date())
+        cached = self._cached
+        if cached is not None and cached[0] == (version, today):
+            return cached[1]
+        frame = build_frame(tasks)
+        report = {
+            "summary": summarize(frame, today),
+            "completion_hours": completion_time_percentiles(frame),
+            "completion_by_category": completion_by(frame, "category"),
+            "burndown": burndown(frame, today, burndown_days)
+        }
+        self._cached = ((version, today), report)
+        return report
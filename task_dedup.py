@@ -0,0 +1,121 @@
+import re
+import numpy as np
+
+# Near-duplicate detection for task titles.
+# Each title becomes a set of character shingles and a MinHash signature. Signatures are split into
+# bands for locality-sensitive hashing, so finding a near duplicate only compares the few titles that
+# share a band instead of every existing title. Candidates are confirmed with the exact Jaccard similarity.
+
+# Large prime for the MinHash permutations, hash values are kept below it
+_PRIME = (1 << 61) - 1
+_EMPTY = object()
+
+
+# Function to turn text into a set of hashed character shingles of its normalized words.
+# Python's string hash is only stable within a process, which is all an in-memory index needs.
+def shingles(text, size=4):
+    normalized = " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+    if len(normalized) <= size:
+        return {hash(normalized) & 0xFFFFFFFF} if normalized else set()
+    return {hash(normalized[i:i + size]) & 0xFFFFFFFF for i in range(len(normalized) - size + 1)}
+
+
+def jaccard(first, second):
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold=0.6, num_perm=64, bands=16, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        random = np.random.default_rng(seed)
+        # Permutations h -> (a * h + b) mod prime; 32-bit shingle hashes times a stay below 2**64
+        self._a = random.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = random.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        # Multipliers that fold each band's rows into one 64-bit bucket key, different for every band
+        self._mix = random.integers(1, 1 << 63, size=(bands, self.rows), dtype=np.uint64)
+        # key -> shingle set, key -> its bucket keys, and bucket key -> the key or list of keys in that bucket
+        self._shingles = {}
+        self._band_keys = {}
+        self._buckets = {}
+
+    # Function to return the bucket keys of each shingle set, computed for all of them in one NumPy pass
+    def _bucket_keys(self, shingle_sets):
+        sizes = [len(shingle_set) for shingle_set in shingle_sets]
+        nonempty = [position for position, size in enumerate(sizes) if size]
+        result = [[] for _ in shingle_sets]
+        if not nonempty:
+            return result
+        values = np.fromiter((value for shingle_set in shingle_sets for value in shingle_set), dtype=np.uint64, count=sum(sizes))
+        hashed = (np.outer(self._a, values) + self._b[:, None]) % _PRIME
+        offsets = np.cumsum([0] + sizes[:-1])[nonempty]
+        # MinHash signatures, one column per text
+        signatures = np.minimum.reduceat(hashed, offsets, axis=1)
+        banded = signatures.reshape(self.bands, self.rows, len(nonempty))
+        with np.errstate(over="ignore"):
+            keys = (banded * self._mix[:, :, None]).sum(axis=1, dtype=np.uint64)
+        for column, band_keys in enumerate(keys.T.tolist()):
+            result[nonempty[column]] = band_keys
+        return result
+
+    # Index a text under a key (e.g. a task ID), replacing what was indexed for it before
+    def add(self, key, text):
+        self.add_many([(key, text)])
+
+    # Index many (key, text) pairs, chunk texts at a time
+    def add_many(self, items, chunk=2000):
+        items = list(items)
+        for start in range(0, len(items), chunk):
+            part = [(key, shingles(text)) for key, text in items[start:start + chunk]]
+            bucket_keys = self._bucket_keys([shingle_set for _, shingle_set in part])
+            buckets = self._buckets
+            for (key, shingle_set), band_keys in zip(part, bucket_keys):
+                if key in self._shingles:
+                    self.remove(key)
+                self._shingles[key] = shingle_set
+                self._band_keys[key] = band_keys
+                for bucket in band_keys:
+                    # Most buckets hold a single key, which is stored as is; shared buckets hold a list
+                    current = buckets.get(bucket, _EMPTY)
+                    if current is _EMPTY:
+                        buckets[bucket] = key
+                    elif type(current) is list:
+                        current.append(key)
+                    else:
+                        buckets[bucket] = [current, key]
+
+    def remove(self, key):
+        for bucket in self._band_keys.pop(key, ()):
+            keys = self._buckets[bucket]
+            if type(keys) is not list:
+                del self._buckets[bucket]
+                continue
+            keys.remove(key)
+            if len(keys) == 1:
+                self._buckets[bucket] = keys[0]
+        self._shingles.pop(key, None)
+
+    # Return (key, similarity) of the most similar indexed text at or above the threshold, or None
+    def find(self, text):
+        shingle_set = shingles(text)
+        candidates = set()
+        for bucket in self._bucket_keys([shingle_set])[0]:
+            keys = self._buckets.get(bucket, _EMPTY)
+            if type(keys) is list:
+                candidates.update(keys)
+            elif keys is not _EMPTY:
+                candidates.add(keys)
+        best = None
+        for key in candidates:
+            similarity = jaccard(shingle_set, self._shingles[key])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+    def __len__(self):
+        return len(self._shingles)
@@ -0,0 +1,162 @@
+import io
+import json
+from datetime import datetime
+from task_store import TASK_FIELDS
+from task_model import Category, Priority, Status
+
+# Bulk import and export of tasks as JSONL, CSV or Parquet.
+# Files are read and written in chunks, so memory use depends on the chunk size and not the file size.
+
+FORMATS = ["jsonl", "csv", "parquet"]
+PRIORITIES = Priority.labels()
+CATEGORIES = Category.labels()
+STATUSES = Status.labels()
+
+
+# Function to check one imported record and turn it into a task dict ready for the store.
+# Raises ValueError describing the first problem found.
+def normalize_task(record):
+    if not isinstance(record, dict):
+        raise ValueError("record is not an object")
+
+    def text(field, default=None):
+        value = record.get(field)
+        # pandas and pyarrow give NaN/None for empty cells
+        if value is None or value != value or value == "":
+            return default
+        return str(value).strip()
+
+    # Timestamps are stored as "YYYY-MM-DD HH:MM", any ISO 8601 form is accepted
+    def timestamp(value):
+        if value is None:
+            return None
+        try:
+            return datetime.fromisoformat(value).strftime("%Y-%m-%d %H:%M")
+        except ValueError:
+            raise ValueError(f"invalid timestamp {value!r}")
+
+    title = text("title")
+    if not title:
+        raise ValueError("title is required")
+    priority = text("priority", "Medium")
+    if priority not in PRIORITIES:
+        raise ValueError(f"unknown priority {priority!r}")
+    category = text("category", "Personal")
+    if category not in CATEGORIES:
+        raise ValueError(f"unknown category {category!r}")
+    status = text("status", "Pending")
+    if status not in STATUSES:
+        raise ValueError(f"unknown status {status!r}")
+
+    due_date = text("due_date")
+    if due_date:
+        due_date = datetime.strptime(due_date[:10], "%Y-%m-%d").strftime("%Y-%m-%d")
+    created_at = timestamp(text("created_at")) or datetime.now().strftime("%Y-%m-%d %H:%M")
+    completed_at = timestamp(text("completed_at"))
+    if status == "Completed" and not completed_at:
+        completed_at = created_at
+    if status == "Pending":
+        completed_at = None
+
+    return {
+        "title": title,
+        "description": text("description", ""),
+        "priority": priority,
+        "category": category,
+        "status": status,
+        "created_at": created_at,
+        "due_date": due_date,
+        "completed_at": completed_at
+    }
+
+
+# Function to yield lists of raw records from a binary file object, chunk_size records at a time.
+# A JSONL line that cannot be parsed is yielded as a ValueError in place of its record.
+def read_records(file, fmt, chunk_size=5000):
+    if fmt == "jsonl":
+        lines = io.TextIOWrapper(file, encoding="utf-8")
+        try:
+            chunk = []
+            for line in lines:
+                if line.strip():
+                    try:
+                        chunk.append(json.loads(line))
+                    except ValueError as e:
+                        chunk.append(ValueError(f"invalid JSON: {e}"))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+        finally:
+            # Leave the caller's file open
+            lines.detach()
+    elif fmt == "csv":
+        import pandas as pd
+        for frame in pd.read_csv(file, chunksize=chunk_size, dtype=str, keep_default_na=False):
+            yield frame.to_dict("records")
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(file).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+
+
+# Function to import tasks from a file into the store in validated batches.
+# on_batch(tasks) is called with every stored batch, e.g. to update the session's task index.
+# Returns (number imported, list of (record number, error message)); at most max_errors errors are kept.
+def import_tasks(file, fmt, store, chunk_size=5000, on_batch=None, max_errors=100):
+    imported = 0
+    errors = []
+    record_number = 0
+    for records in read_records(file, fmt, chunk_size):
+        batch = []
+        for record in records:
+            record_number += 1
+            try:
+                if isinstance(record, ValueError):
+                    raise record
+                batch.append(normalize_task(record))
+            except (ValueError, TypeError, AttributeError) as e:
+                if len(errors) < max_errors:
+                    errors.append((record_number, str(e)))
+        if batch:
+            added = store.add_many(batch)
+            imported += len(added)
+            if on_batch:
+                on_batch(added)
+    return imported, errors
+
+
+# Function to write tasks to a binary file object in chunks
+def export_tasks(tasks, fmt, file, chunk_size=5000):
+    chunks = _chunked(tasks, chunk_size)
+    if fmt == "jsonl":
+        for chunk in chunks:
+            file.write("".join(json.dumps({field: task.get(field) for field in TASK_FIELDS}) + "\n" for task in chunk).encode("utf-8"))
+    elif fmt == "csv":
+        import pandas as pd
+        for number, chunk in enumerate(chunks):
+            frame = pd.DataFrame(chunk, columns=TASK_FIELDS)
+            file.write(frame.to_csv(index=False, header=number == 0, lineterminator="\n").encode("utf-8"))
+    elif fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = pa.schema([("id", pa.int64())] + [(field, pa.string()) for field in TASK_FIELDS if field != "id"])
+        with pq.ParquetWriter(file, schema) as writer:
+            for chunk in chunks:
+                writer.write_table(pa.Table.from_pylist([{field: task.get(field) for field in TASK_FIELDS} for task in chunk], schema=schema))
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+
+
+def _chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
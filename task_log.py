@@ -0,0 +1,275 @@
+import os
+import json
+import threading
+import time
+from datetime import datetime
+from task_store import ConflictError, MemoryTaskStore
+
+# Append-only task storage for the AI To-Do Manager.
+# Every add, update and delete is appended to a JSONL write-ahead log before it is applied in
+# memory. The log is fsynced in batches, so a burst of writes shares one disk flush. After
+# compact_every records the in-memory state is written to a snapshot and the log is rotated into
+# an archived segment. Startup loads the snapshot and replays only the records written after it,
+# which keeps recovery time bounded. Archived segments keep the full history for audits; a task's
+# history is read through an index of where its records are, built on first use.
+#
+# Layout of the log directory:
+#   snapshot.json            latest snapshot: {"seq": ..., "next_id": ..., "tasks": [...]}
+#   wal.jsonl                records written since the last rotation
+#   segments/<seq>.jsonl     rotated logs, named by the sequence number of their last record
+#
+# Each record is {"seq": n, "at": "YYYY-MM-DD HH:MM:SS", "op": "add" | "update" | "delete",
+# "id": task_id, "fields": {...}}.
+
+
+class LogTaskStore(MemoryTaskStore):
+    def __init__(self, directory, fsync_batch=64, fsync_interval=0.2, compact_every=10000):
+        super().__init__()
+        self.directory = directory
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self._snapshot_path = os.path.join(directory, "snapshot.json")
+        self._wal_path = os.path.join(directory, "wal.jsonl")
+        self._segments_dir = os.path.join(directory, "segments")
+        os.makedirs(self._segments_dir, exist_ok=True)
+
+        self._seq = 0
+        self._next_id = 1
+        # Records written but not yet fsynced, and records since the last snapshot
+        self._unsynced = 0
+        self._since_snapshot = 0
+        self._synced_at = time.monotonic()
+        self._snapshot_thread = None
+        self._closed = threading.Event()
+        self.recover()
+        self._wal = open(self._wal_path, "a", encoding="utf-8", newline="\n")
+        # Log files in write order, the last one is the live log, and the live log's size in bytes
+        self._files = self._log_files()
+        self._wal_size = os.path.getsize(self._wal_path)
+        # task_id -> (file number, byte offset) of each of its records; None until history() first needs it
+        self._history_index = None
+        self._history_lock = threading.Lock()
+        # Flushes writes that did not fill a batch, bounding how long a write stays unsynced
+        self._flusher = threading.Thread(target=self._flush_periodically, name="task-log-flusher", daemon=True)
+        self._flusher.start()
+
+    # Rebuild the tasks from the latest snapshot plus the records written after it
+    def recover(self):
+        snapshot_seq = 0
+        if os.path.exists(self._snapshot_path):
+            with open(self._snapshot_path, encoding="utf-8") as file:
+                snapshot = json.load(file)
+            snapshot_seq = self._seq = snapshot["seq"]
+            self._next_id = snapshot["next_id"]
+            self._tasks = {task["id"]: task for task in snapshot["tasks"]}
+        replayed = 0
+        for record in self._read_records(after=snapshot_seq, repair=True):
+            self._apply_record(record)
+            replayed += 1
+        self._since_snapshot = replayed
+        self._position = 0
+        self._changes.clear()
+
+    # Paths of the log files holding records with seq above `after`, in write order
+    def _log_files(self, after=0):
+        segments = sorted((int(name.split(".")[0]), name) for name in os.listdir(self._segments_dir)
+                          if name.endswith(".jsonl"))
+        paths = [os.path.join(self._segments_dir, name) for last_seq, name in segments if last_seq > after]
+        return paths + [self._wal_path] if os.path.exists(self._wal_path) else paths
+
+    # Yield log records with seq above `after`. A torn last line from a crash is cut off when repair is set.
+    def _read_records(self, after=0, repair=False):
+        for path in self._log_files(after):
+            with open(path, "rb") as file:
+                good_end = 0
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        if repair and path == self._wal_path:
+                            file.close()
+                            os.truncate(path, good_end)
+                        break
+                    good_end += len(line)
+                    if record["seq"] > after:
+                        yield record
+
+    def _apply_record(self, record):
+        task_id = record["id"]
+        if record["op"] == "add":
+            self._tasks[task_id] = dict(record["fields"], id=task_id, version=1)
+            self._next_id = max(self._next_id, task_id + 1)
+        elif record["op"] == "update":
+            task = self._tasks[task_id]
+            task.update(record["fields"])
+            task["version"] += 1
+        else:
+            self._tasks.pop(task_id, None)
+        self._seq = record["seq"]
+
+    # Append a record and apply it; must be called with the lock held
+    def _log(self, op, task_id, fields=None):
+        self._seq += 1
+        record = {"seq": self._seq, "at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                  "op": op, "id": task_id, "fields": fields or {}}
+        line = json.dumps(record) + "\n"
+        self._wal.write(line)
+        if self._history_index is not None:
+            self._history_index.setdefault(task_id, []).append((len(self._files) - 1, self._wal_size))
+        # json.dumps escapes non-ASCII characters, so the length in characters is the length in bytes
+        self._wal_size += len(line)
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_batch:
+            self._sync()
+        self._apply_record(record)
+        self._record_change(task_id)
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.compact_every:
+            self._rotate()
+
+    # Write buffered records to disk; must be called with the lock held
+    def _sync(self):
+        if self._unsynced:
+            self._wal.flush()
+            os.fsync(self._wal.fileno())
+            self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.fsync_interval):
+            with self._lock:
+                if self._unsynced and time.monotonic() - self._synced_at >= self.fsync_interval:
+                    self._sync()
+
+    # Move the current log into the segments and snapshot the state it leads to.
+    # The snapshot is written in the background; until it is in place, recovery replays the segment.
+    def _rotate(self):
+        if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+            return
+        self._sync()
+        self._wal.close()
+        segment_path = os.path.join(self._segments_dir, f"{self._seq}.jsonl")
+        os.replace(self._wal_path, segment_path)
+        self._wal = open(self._wal_path, "a", encoding="utf-8", newline="\n")
+        self._files[-1] = segment_path
+        self._files.append(self._wal_path)
+        self._wal_size = 0
+        snapshot = {"seq": self._seq, "next_id": self._next_id, "tasks": [dict(task) for task in self._tasks.values()]}
+        self._since_snapshot = 0
+        self._snapshot_thread = threading.Thread(target=self._write_snapshot, args=(snapshot,), name="task-log-snapshot")
+        self._snapshot_thread.start()
+
+    def _write_snapshot(self, snapshot):
+        temporary = self._snapshot_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(snapshot, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self._snapshot_path)
+
+    def add(self, task):
+        with self._lock:
+            task_id = self._next_id
+            self._log("add", task_id, {field: value for field, value in task.items() if field not in ("id", "version")})
+            return dict(self._tasks[task_id])
+
+    def update(self, task_id, fields, expected_version=None):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return False
+            if expected_version is not None and task["version"] != expected_version:
+                raise ConflictError(task_id, dict(task))
+            self._log("update", task_id, {field: value for field, value in fields.items() if field not in ("id", "version")})
+            return True
+
+    def delete(self, task_id):
+        with self._lock:
+            if task_id not in self._tasks:
+                return False
+            self._log("delete", task_id)
+            return True
+
+    # Return the log records, oldest first, optionally only those of one task, at/after a time, or the
+    # newest `limit` of them. A task's records are read through the history index, so the cost depends
+    # on the records returned rather than the size of the log. Files are read without holding the lock.
+    def history(self, task_id=None, since=None, limit=None):
+        if task_id is None:
+            with self._lock:
+                self._sync()
+                end = self._seq
+            records = [record for record in self._read_records()
+                       if record["seq"] <= end and (since is None or record["at"] >= since)]
+            return records[-limit:] if limit else records
+
+        self._build_history_index()
+        with self._lock:
+            self._sync()
+            positions = list(self._history_index.get(task_id, ()))
+        records = []
+        files = {}
+        try:
+            # Newest first, so reading stops at the limit or at the first record before `since`
+            for number, offset in reversed(positions):
+                if limit and len(records) >= limit:
+                    break
+                if number not in files:
+                    files[number] = self._open_log_file(number)
+                files[number].seek(offset)
+                record = json.loads(files[number].readline())
+                if since is not None and record["at"] < since:
+                    break
+                records.append(record)
+        finally:
+            for file in files.values():
+                file.close()
+        return records[::-1]
+
+    # Open a log file by its number in self._files; the live log may be rotated into a segment meanwhile
+    def _open_log_file(self, number):
+        with self._lock:
+            return open(self._files[number], "rb")
+
+    # Index where each task's records are by scanning the log files once. Records written during the scan
+    # are indexed by _log, the scan covers everything written before it started.
+    def _build_history_index(self):
+        with self._history_lock:
+            if self._history_index is not None:
+                return
+            with self._lock:
+                self._sync()
+                self._history_index = {}
+                file_count = len(self._files)
+                live_size = self._wal_size
+            scanned = {}
+            for number in range(file_count):
+                offset = 0
+                with self._open_log_file(number) as file:
+                    for line in file:
+                        if number == file_count - 1 and offset >= live_size:
+                            break
+                        try:
+                            task_id = json.loads(line)["id"]
+                        except ValueError:
+                            break
+                        scanned.setdefault(task_id, []).append((number, offset))
+                        offset += len(line)
+            with self._lock:
+                for task_id, positions in scanned.items():
+                    self._history_index[task_id] = positions + self._history_index.get(task_id, [])
+
+    # Return (task_id, value, recorded at) for every record that set a field, e.g. each time a task
+    # was completed for "completed_at", including completions that were later undone
+    def field_history(self, field, since=None):
+        return [(record["id"], record["fields"][field], record["at"]) for record in self.history(since=since)
+                if field in record["fields"]]
+
+    def close(self):
+        self._closed.set()
+        self._flusher.join()
+        with self._lock:
+            self._sync()
+            self._wal.close()
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
@@ -0,0 +1,145 @@
+from datetime import date, datetime
+from enum import IntEnum
+
+# Typed task model for the AI To-Do Manager.
+# Tasks in memory are Task objects: __slots__ instead of a per-task dict, small-int enums instead of
+# repeated status/priority/category strings, and datetime/date values parsed once. Stores, files and
+# prompts still use the plain record dicts (strings, see task_store.TASK_FIELDS); from_record() and
+# to_record() convert at those boundaries.
+
+# Timestamp format used in records and shown in the UI
+DATETIME_FORMAT = "%Y-%m-%d %H:%M"
+
+
+# Small-int enum whose members also carry the label used in records and the UI
+class Choice(IntEnum):
+    def __new__(cls, value, label):
+        member = int.__new__(cls, value)
+        member._value_ = value
+        member.label = label
+        return member
+
+    def __str__(self):
+        return self.label
+
+    def __format__(self, spec):
+        return format(self.label, spec)
+
+    # Return the member with the given label, raises ValueError for unknown labels
+    @classmethod
+    def parse(cls, label):
+        if isinstance(label, cls):
+            return label
+        for member in cls:
+            if member.label == label:
+                return member
+        raise ValueError(f"unknown {cls.__name__.lower()} {label!r}")
+
+    @classmethod
+    def labels(cls):
+        return [member.label for member in cls]
+
+
+class Priority(Choice):
+    HIGH = 0, "High"
+    MEDIUM = 1, "Medium"
+    LOW = 2, "Low"
+
+
+class Category(Choice):
+    WORK = 0, "Work"
+    PERSONAL = 1, "Personal"
+    HEALTH = 2, "Health"
+    LEARNING = 3, "Learning"
+    OTHER = 4, "Other"
+    AI_SUGGESTED = 5, "AI Suggested"
+
+
+class Status(Choice):
+    PENDING = 0, "Pending"
+    COMPLETED = 1, "Completed"
+
+
+# Enum type of each enum-valued field
+FIELD_ENUMS = {"priority": Priority, "category": Category, "status": Status}
+
+
+# Function to return the current time at the precision stored in records
+def now():
+    return datetime.now().replace(second=0, microsecond=0)
+
+
+def _parse_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def _parse_date(value):
+    if value is None or isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(value[:10])
+
+
+# Function to convert a field value from its record form (string) to its model form
+def parse_field(field, value):
+    if field in FIELD_ENUMS:
+        return FIELD_ENUMS[field].parse(value)
+    if field in ("created_at", "completed_at"):
+        return _parse_datetime(value)
+    if field == "due_date":
+        return _parse_date(value)
+    return value
+
+
+# Function to convert a field value from its model form to its record form (string)
+def format_field(field, value):
+    if field in FIELD_ENUMS:
+        return value.label
+    if field in ("created_at", "completed_at"):
+        return value.strftime(DATETIME_FORMAT) if value else None
+    if field == "due_date":
+        return value.isoformat() if value else None
+    return value
+
+
+class Task:
+    __slots__ = ("id", "title", "description", "priority", "category", "status",
+                 "created_at", "due_date", "completed_at", "version")
+
+    def __init__(self, id, title, description, priority, category, status, created_at,
+                 due_date=None, completed_at=None, version=1):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.priority = priority
+        self.category = category
+        self.status = status
+        self.created_at = created_at
+        self.due_date = due_date
+        self.completed_at = completed_at
+        self.version = version
+
+    # Build a task from a store or file record, parsing every field once
+    @classmethod
+    def from_record(cls, record):
+        return cls(**{field: parse_field(field, record.get(field)) for field in cls.__slots__ if field in record})
+
+    # Return the record dict (string values) for stores, files and prompts
+    def to_record(self):
+        return {field: format_field(field, getattr(self, field)) for field in self.__slots__}
+
+    # Return a copy with some fields changed (model values)
+    def replace(self, **changes):
+        task = Task(*(getattr(self, field) for field in self.__slots__))
+        for field, value in changes.items():
+            setattr(task, field, value)
+        return task
+
+    def __eq__(self, other):
+        return isinstance(other, Task) and all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self):
+        return f"Task(id={self.id!r}, title={self.title!r}, status={self.status.label!r}, version={self.version!r})"
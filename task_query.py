@@ -0,0 +1,87 @@
+import heapq
+from datetime import date
+from task_model import FIELD_ENUMS
+
+# Filtering and statistics helpers for the AI To-Do Manager task list (Task objects, see task_model.py)
+
+# Selectbox value that means "do not filter on this field"
+ALL = "All"
+
+# Fields the task list can be filtered and counted by
+FILTER_FIELDS = ["status", "priority", "category"]
+
+
+# Function to filter tasks on status, priority and category in a single pass.
+# Values may be labels or enum members; labels are parsed once, so each task costs an identity check per field.
+def filter_tasks(tasks, status=ALL, priority=ALL, category=ALL):
+    status, priority, category = (None if value in (None, ALL) else FIELD_ENUMS[field].parse(value)
+                                  for field, value in zip(FILTER_FIELDS, (status, priority, category)))
+    if status is None and priority is None and category is None:
+        return list(tasks)
+    return [task for task in tasks
+            if (status is None or task.status is status)
+            and (priority is None or task.priority is priority)
+            and (category is None or task.category is category)]
+
+
+# Running counters for the Task Statistics panel.
+# Callers report every change with add()/remove() so reading the counts never rescans the task list.
+class TaskStats:
+    def __init__(self, tasks=()):
+        self.total = 0
+        # Bumped on every change, so caches built from the task list know when to rebuild
+        self.version = 0
+        self.counts = {field: {} for field in FILTER_FIELDS}
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task):
+        self._apply(task, 1)
+
+    def remove(self, task):
+        self._apply(task, -1)
+
+    # Replace the counts of a task's old values with its new ones
+    def replace(self, old_task, new_task):
+        self.remove(old_task)
+        self.add(new_task)
+
+    def _apply(self, task, delta):
+        self.total += delta
+        self.version += 1
+        for field, counts in self.counts.items():
+            value = getattr(task, field)
+            counts[value] = counts.get(value, 0) + delta
+            if counts[value] == 0:
+                del counts[value]
+
+    # Return the number of tasks whose field has the given value (label or enum member)
+    def count(self, field, value):
+        return self.counts[field].get(FIELD_ENUMS[field].parse(value), 0)
+
+    # Return {label: count} for a field, listing the given values first (with zeros) in that order
+    def distribution(self, field, values=()):
+        result = {FIELD_ENUMS[field].parse(value).label: self.count(field, value) for value in values}
+        for value, count in self.counts[field].items():
+            result.setdefault(value.label, count)
+        return result
+
+
+# Orderings offered for the task list. Every key ends with the task ID so it is unique,
+# which lets a page be addressed by the key of the task just before it (keyset pagination).
+SORT_KEYS = {
+    "Due date": lambda task: (task.due_date is None, task.due_date or date.min, task.id),
+    "Created": lambda task: (task.created_at, task.id),
+}
+
+
+# Function to return one page of tasks in sort_key order, starting after the cursor.
+# Only the page is sorted, so the cost is O(n log page_size) however many tasks match.
+def page_tasks(tasks, sort_key, after=None, limit=20):
+    if after is not None:
+        tasks = (task for task in tasks if sort_key(task) > after)
+    page = heapq.nsmallest(limit + 1, tasks, key=sort_key)
+    has_more = len(page) > limit
+    page = page[:limit]
+    next_cursor = sort_key(page[-1]) if has_more else None
+    return page, next_cursor
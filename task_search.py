@@ -0,0 +1,113 @@
+import re
+import bisect
+import math
+import threading
+
+# Full-text search over task titles and descriptions for the AI To-Do Manager.
+# An inverted index maps each term to the tasks containing it, so a query only touches the
+# posting lists of its terms instead of scanning every task.
+
+# A term in the title counts as much as this many occurrences in the description
+TITLE_WEIGHT = 3
+
+# Matches on a longer term that merely starts with the query word score this fraction of an exact match
+PREFIX_WEIGHT = 0.5
+
+# Matches on a term that contains the query word elsewhere, e.g. "ship" in "relationship", score this fraction
+SUBSTRING_WEIGHT = 0.25
+
+# Shorter query words only match exactly, since a one-letter prefix matches most of the index
+MIN_PREFIX_LENGTH = 2
+
+# Shorter query words only match exactly or as a prefix
+MIN_SUBSTRING_LENGTH = 3
+
+
+# Function to split text into lowercase words for search.
+# Unlike the FAQ tokenizer nothing is dropped or stemmed, so every word of a title can be searched for.
+def tokenize(text):
+    return re.findall(r"\w+", text.lower())
+
+
+class TaskSearchIndex:
+    def __init__(self, tasks=()):
+        # term -> {task_id: weighted term frequency}
+        self.postings = {}
+        # Sorted list of every indexed term, for prefix lookups with bisect
+        self.terms = []
+        # task_id -> terms indexed for the task, so it can be removed without re-tokenizing
+        self.documents = {}
+        self._lock = threading.Lock()
+        for task in tasks:
+            self.add(task)
+
+    # Index (or re-index) a task's title and description
+    def add(self, task):
+        weights = {}
+        for token in tokenize(task.title):
+            weights[token] = weights.get(token, 0) + TITLE_WEIGHT
+        for token in tokenize(task.description or ""):
+            weights[token] = weights.get(token, 0) + 1
+        with self._lock:
+            self._remove(task.id)
+            self.documents[task.id] = list(weights)
+            for term, weight in weights.items():
+                if term not in self.postings:
+                    self.postings[term] = {}
+                    bisect.insort(self.terms, term)
+                self.postings[term][task.id] = weight
+
+    def remove(self, task_id):
+        with self._lock:
+            self._remove(task_id)
+
+    def _remove(self, task_id):
+        for term in self.documents.pop(task_id, ()):
+            posting = self.postings[term]
+            del posting[task_id]
+            if not posting:
+                del self.postings[term]
+                del self.terms[bisect.bisect_left(self.terms, term)]
+
+    # Return the indexed terms containing word: only itself for very short words, then terms starting
+    # with it, and from MIN_SUBSTRING_LENGTH on every term it appears in (a scan of the term list)
+    def expand(self, word):
+        if len(word) < MIN_PREFIX_LENGTH:
+            return [word] if word in self.postings else []
+        if len(word) < MIN_SUBSTRING_LENGTH:
+            start = bisect.bisect_left(self.terms, word)
+            end = bisect.bisect_left(self.terms, word + "\uffff", start)
+            return self.terms[start:end]
+        return [term for term in self.terms if word in term]
+
+    # Return {task_id: score} for tasks matching every query word, exactly, as a prefix or inside a longer word.
+    # Scores add up the TF-IDF weight of each matched term, exact matches counting the most.
+    def search(self, query):
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            return {}
+        with self._lock:
+            total = len(self.documents)
+            per_word = []
+            for word in words:
+                scores = {}
+                for term in self.expand(word):
+                    posting = self.postings[term]
+                    if term == word:
+                        match_weight = 1.0
+                    elif term.startswith(word):
+                        match_weight = PREFIX_WEIGHT
+                    else:
+                        match_weight = SUBSTRING_WEIGHT
+                    factor = math.log(1 + total / len(posting)) * match_weight
+                    for task_id, weight in posting.items():
+                        scores[task_id] = scores.get(task_id, 0.0) + weight * factor
+                if not scores:
+                    return {}
+                per_word.append(scores)
+        # Intersect starting from the rarest word, so the candidate set only shrinks
+        per_word.sort(key=len)
+        results = dict(per_word[0])
+        for scores in per_word[1:]:
+            results = {task_id: score + scores[task_id] for task_id, score in results.items() if task_id in scores}
+        return results
@@ -0,0 +1,119 @@
+import threading
+from task_model import Status, Task
+from task_query import TaskStats
+from task_analytics import TaskAnalytics
+from due_index import DueDateIndex, ReminderScheduler
+from task_search import TaskSearchIndex
+from task_dedup import NearDuplicateIndex
+
+# Tasks and derived indexes of the AI To-Do Manager, held once per server process.
+# Every session reads the same copy, and the store's change feed is applied here once instead of
+# once per session. Writers replace the task dict instead of changing it in place, so a session can
+# iterate the dict it read without holding the lock while other sessions write.
+
+
+class SharedTasks:
+    def __init__(self, store, duplicate_threshold=0.6, reminder_interval=60):
+        self.store = store
+        self.duplicate_threshold = duplicate_threshold
+        # Held while writing, and while reading the counters and indexes that are not thread-safe
+        self.lock = threading.RLock()
+        self.tasks = {}
+        self.due_index = DueDateIndex()
+        self.load()
+        # The scheduler runs in its own thread and looks titles up in whatever task dict is current
+        self.reminders = ReminderScheduler(
+            self.due_index,
+            lambda task_id: self.tasks[task_id].title if task_id in self.tasks else None,
+            interval=reminder_interval,
+        )
+
+    # Load every task from the store and rebuild the counters and indexes
+    def load(self):
+        with self.lock:
+            # Read the change feed position first, so writes made during the load are applied by the next sync
+            self.position = self.store.last_change()
+            # Tasks are indexed by their store-assigned ID, which is never reused
+            tasks = {record["id"]: Task.from_record(record) for record in self.store.load_all()}
+            self.stats = TaskStats(tasks.values())
+            self.analytics = TaskAnalytics()
+            self.due_index.clear()
+            for task in tasks.values():
+                self.due_index.add(task.id, task.due_date, pending=task.status is Status.PENDING)
+            self.search = TaskSearchIndex(tasks.values())
+            # Built on first use by title_index()
+            self._title_index = None
+            self.tasks = tasks
+
+    # Apply the changes other server processes made since the last sync.
+    # Only changed tasks are refreshed; everything is reloaded if the feed no longer reaches back far enough.
+    def sync(self):
+        with self.lock:
+            feed = self.store.changes(self.position)
+            if feed is None:
+                self.load()
+                return
+            self.position, changed, deleted = feed
+            self.apply([Task.from_record(record) for record in changed])
+            self.forget(deleted)
+
+    # Put new or changed tasks into the task dict, counters and indexes.
+    # A task is never replaced by an older version of itself, e.g. a change feed entry for a write
+    # that another session has since overtaken.
+    def apply(self, tasks):
+        if not tasks:
+            return
+        with self.lock:
+            updated = dict(self.tasks)
+            for task in tasks:
+                old_task = updated.get(task.id)
+                if old_task is not None and old_task.version >= task.version:
+                    continue
+                updated[task.id] = task
+                if old_task is None:
+                    self.stats.add(task)
+                else:
+                    self.stats.replace(old_task, task)
+                self.search.add(task)
+                self.due_index.add(task.id, task.due_date, pending=task.status is Status.PENDING)
+                if self._title_index is not None:
+                    self._title_index.add(task.id, task.title)
+            self.tasks = updated
+
+    # Drop deleted tasks from the task dict, counters and indexes
+    def forget(self, task_ids):
+        if not task_ids:
+            return
+        with self.lock:
+            updated = dict(self.tasks)
+            for task_id in task_ids:
+                task = updated.pop(task_id, None)
+                if task is None:
+                    continue
+                self.stats.remove(task)
+                self.due_index.remove(task_id)
+                self.search.remove(task_id)
+                if self._title_index is not None:
+                    self._title_index.remove(task_id)
+            self.tasks = updated
+
+    # Return the near-duplicate index of task titles, built the first time it is needed
+    def title_index(self):
+        with self.lock:
+            if self._title_index is None:
+                index = NearDuplicateIndex(threshold=self.duplicate_threshold)
+                index.add_many((task.id, task.title) for task in self.tasks.values())
+                self._title_index = index
+            return self._title_index
+
+    # Return the analytics report of the current tasks; the tasks and their version are read together
+    def report(self):
+        with self.lock:
+            tasks, version = self.tasks, self.stats.version
+        return self.analytics.report(tasks.values(), version)
+
+    # Return the existing task a title nearly duplicates, or None
+    def find_duplicate(self, title):
+        with self.lock:
+            match = self.title_index().find(title)
+            return self.tasks.get(match[0]) if match else None
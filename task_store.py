@@ -0,0 +1,305 @@
+import os
+import sqlite3
+import threading
+import itertools
+import collections
+
+# Task storage backends for the AI To-Do Manager.
+# A store persists task dicts (the same shape ai_todo.py builds) and hands out their IDs.
+# Stores can be shared by many sessions and server processes: every task carries a version that
+# update() can compare before writing, and every write is recorded in a change feed that sessions
+# read to refresh only the tasks that changed.
+# Sessions keep every task in memory and filter, sort and count there, so stores only load and write tasks.
+
+# Columns kept for every task, in the order ai_todo.py builds them
+TASK_FIELDS = ["id", "title", "description", "priority", "category", "status", "created_at", "due_date", "completed_at"]
+
+# Number of recent changes kept in the change feed; sessions further behind reload every task
+CHANGE_FEED_SIZE = int(os.environ.get("TASK_CHANGE_FEED_SIZE", "10000"))
+
+
+# Raised by update() when the task was changed since the caller read it
+class ConflictError(Exception):
+    def __init__(self, task_id, current):
+        super().__init__(f"Task {task_id} was changed by someone else")
+        self.task_id = task_id
+        # The task as it is now in the store
+        self.current = current
+
+
+# Base class every storage backend implements
+class TaskStore:
+    # Return every stored task, oldest first
+    def load_all(self):
+        raise NotImplementedError
+
+    # Return a single task or None
+    def get(self, task_id):
+        raise NotImplementedError
+
+    # Insert a task, assign its ID and return it
+    def add(self, task):
+        raise NotImplementedError
+
+    # Insert many tasks in one batch and return them with their IDs
+    def add_many(self, tasks):
+        return [self.add(task) for task in tasks]
+
+    # Change some fields of a task and bump its version, returns False if it does not exist.
+    # With expected_version set, raises ConflictError unless the stored task still has that version.
+    def update(self, task_id, fields, expected_version=None):
+        raise NotImplementedError
+
+    # Remove a task, returns False if it does not exist
+    def delete(self, task_id):
+        raise NotImplementedError
+
+    # Return the position of the latest change, to pass to changes() later
+    def last_change(self):
+        raise NotImplementedError
+
+    # Return (position, changed tasks, deleted task IDs) for writes after the given position,
+    # or None if those changes are no longer in the feed and everything must be reloaded
+    def changes(self, since):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+# Keeps tasks in a dict for the lifetime of the process
+class MemoryTaskStore(TaskStore):
+    def __init__(self):
+        self._tasks = {}
+        self._ids = itertools.count(1)
+        # (position, task_id) of recent writes
+        self._changes = collections.deque(maxlen=CHANGE_FEED_SIZE)
+        self._position = 0
+        self._lock = threading.Lock()
+
+    def _record_change(self, task_id):
+        self._position += 1
+        self._changes.append((self._position, task_id))
+
+    def load_all(self):
+        with self._lock:
+            return [dict(task) for task in self._tasks.values()]
+
+    def get(self, task_id):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return dict(task) if task else None
+
+    def add(self, task):
+        with self._lock:
+            task = dict(task, id=next(self._ids), version=1)
+            self._tasks[task["id"]] = task
+            self._record_change(task["id"])
+            return dict(task)
+
+    def update(self, task_id, fields, expected_version=None):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return False
+            if expected_version is not None and task["version"] != expected_version:
+                raise ConflictError(task_id, dict(task))
+            task.update((field, value) for field, value in fields.items() if field not in ("id", "version"))
+            task["version"] += 1
+            self._record_change(task_id)
+            return True
+
+    def delete(self, task_id):
+        with self._lock:
+            if self._tasks.pop(task_id, None) is None:
+                return False
+            self._record_change(task_id)
+            return True
+
+    def last_change(self):
+        with self._lock:
+            return self._position
+
+    def changes(self, since):
+        with self._lock:
+            if since < self._position - len(self._changes) or since > self._position:
+                return None
+            changed_ids = {task_id for position, task_id in self._changes if position > since}
+            changed = [dict(self._tasks[task_id]) for task_id in changed_ids if task_id in self._tasks]
+            deleted = [task_id for task_id in changed_ids if task_id not in self._tasks]
+            return self._position, changed, deleted
+
+
+# Persists tasks in a SQLite file
+class SQLiteTaskStore(TaskStore):
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT NOT NULL DEFAULT '',
+        priority TEXT NOT NULL,
+        category TEXT NOT NULL,
+        status TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        due_date TEXT,
+        completed_at TEXT,
+        version INTEGER NOT NULL DEFAULT 1
+    );
+    CREATE TABLE IF NOT EXISTS task_changes (
+        position INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER NOT NULL
+    );
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # Streamlit runs each session in its own thread, so the connection is shared behind a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                # Other server processes write to the same file, wait for their locks instead of failing
+                self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.executescript(self.SCHEMA)
+            # Databases created before tasks had versions
+            columns = [row["name"] for row in self._conn.execute("PRAGMA table_info(tasks)")]
+            if "version" not in columns:
+                self._conn.execute("ALTER TABLE tasks ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+            self._conn.commit()
+
+    def _fetch(self, sql, params=()):
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    # Run a write and record it in the change feed within one transaction, returns the row count
+    def _write(self, task_id, sql, params=()):
+        with self._lock:
+            try:
+                rowcount = self._conn.execute(sql, params).rowcount
+                if rowcount:
+                    self._record_change(task_id)
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return rowcount
+
+    # Must be called with the lock held, inside the write's transaction
+    def _record_change(self, task_id):
+        cursor = self._conn.execute("INSERT INTO task_changes (task_id) VALUES (?)", (task_id,))
+        if cursor.lastrowid % 1000 == 0:
+            self._conn.execute("DELETE FROM task_changes WHERE position <= ?", (cursor.lastrowid - CHANGE_FEED_SIZE,))
+
+    def load_all(self):
+        return self._fetch("SELECT * FROM tasks ORDER BY id")
+
+    def get(self, task_id):
+        rows = self._fetch("SELECT * FROM tasks WHERE id = ?", (task_id,))
+        return rows[0] if rows else None
+
+    def add(self, task):
+        return self.add_many([task])[0]
+
+    # All rows go in one transaction, so a batch is written with a single commit
+    def add_many(self, tasks):
+        columns = [field for field in TASK_FIELDS if field != "id"]
+        sql = f"INSERT INTO tasks ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        added = []
+        with self._lock:
+            try:
+                for task in tasks:
+                    cursor = self._conn.execute(sql, [task.get(field) for field in columns])
+                    added.append(dict(task, id=cursor.lastrowid, version=1))
+                    self._record_change(cursor.lastrowid)
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return added
+
+    def update(self, task_id, fields, expected_version=None):
+        fields = {field: value for field, value in fields.items() if field not in ("id", "version")}
+        for field in fields:
+            _check_field(field, TASK_FIELDS)
+        assignments = "".join(f"{field} = ?, " for field in fields)
+        sql = f"UPDATE tasks SET {assignments}version = version + 1 WHERE id = ?"
+        params = [*fields.values(), task_id]
+        if expected_version is not None:
+            # Compare-and-swap: the row only changes if nobody wrote it since the caller read it
+            sql += " AND version = ?"
+            params.append(expected_version)
+        if self._write(task_id, sql, params):
+            return True
+        current = self.get(task_id)
+        if current is None:
+            return False
+        raise ConflictError(task_id, current)
+
+    def delete(self, task_id):
+        return self._write(task_id, "DELETE FROM tasks WHERE id = ?", (task_id,)) > 0
+
+    def last_change(self):
+        return self._fetch("SELECT COALESCE(MAX(position), 0) AS position FROM task_changes")[0]["position"]
+
+    def changes(self, since):
+        with self._lock:
+            # One read transaction, so the feed and the tasks are seen at the same point in time
+            self._conn.execute("BEGIN")
+            try:
+                oldest, latest = self._conn.execute(
+                    "SELECT MIN(position), COALESCE(MAX(position), 0) FROM task_changes").fetchone()
+                if oldest is not None and since < oldest - 1 or since > latest:
+                    return None
+                changed_ids = [row[0] for row in self._conn.execute(
+                    "SELECT DISTINCT task_id FROM task_changes WHERE position > ?", (since,))]
+                changed = []
+                if changed_ids:
+                    placeholders = ", ".join("?" for _ in changed_ids)
+                    changed = [dict(row) for row in self._conn.execute(
+                        f"SELECT * FROM tasks WHERE id IN ({placeholders})", changed_ids)]
+            finally:
+                self._conn.commit()
+        found = {task["id"] for task in changed}
+        return latest, changed, [task_id for task_id in changed_ids if task_id not in found]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Column names are interpolated into SQL, so only known ones are accepted
+def _check_field(field, allowed):
+    if field not in allowed:
+        raise ValueError(f"Unknown task field: {field}")
+
+
+# Registry of available backends, keyed by the name used in TASK_STORE_BACKEND
+BACKENDS = {}
+
+def register_backend(name, factory):
+    BACKENDS[name] = factory
+
+register_backend("memory", lambda **options: MemoryTaskStore())
+register_backend("sqlite", lambda path=None, **options: SQLiteTaskStore(path or os.environ.get("TASK_DB_PATH", "tasks.db")))
+
+# Append-only log with snapshots, kept in task_log.py
+def _open_log_store(path=None, **options):
+    from task_log import LogTaskStore
+    return LogTaskStore(
+        path or os.environ.get("TASK_LOG_DIR", "task_log"),
+        fsync_batch=int(os.environ.get("TASK_LOG_FSYNC_BATCH", "64")),
+        fsync_interval=float(os.environ.get("TASK_LOG_FSYNC_INTERVAL", "0.2")),
+        compact_every=int(os.environ.get("TASK_LOG_COMPACT_EVERY", "10000")),
+    )
+
+register_backend("log", _open_log_store)
+
+# Function to open the configured task store
+def open_task_store(backend=None, **options):
+    backend = backend or os.environ.get("TASK_STORE_BACKEND", "sqlite")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown task store backend: {backend}")
+    return BACKENDS[backend](**options)
@@ -0,0 +1,80 @@
+import json
+import hashlib
+from llm_gateway import get_gateway
+
+# Map-reduce summarization for large task lists.
+# Tasks are split into category/priority chunks, each chunk is summarized on its own (in parallel
+# through the LLM gateway) and the chunk summaries are combined by a final prompt. A chunk is only
+# sent to the model again when the tasks in it changed since the last run.
+
+CHUNK_SYSTEM_PROMPT = "You are a productivity expert. Summarize these tasks in at most 40 words, noting what is done, what is pending and anything urgent."
+REDUCE_SYSTEM_PROMPT = "You are a productivity expert. Combine these summaries of task groups into a concise summary (max 50 words) of all tasks, highlighting priorities and overall progress."
+
+
+# Function to format tasks (Task objects) as prompt lines
+def format_task_lines(tasks):
+    return "\n".join(f"{i+1}. {task.title} - {task.description} ({task.status})" for i, task in enumerate(tasks))
+
+
+# Function to split tasks into {(category, priority, part): tasks} chunks of at most max_size tasks.
+# Tasks are ordered by ID, so new tasks land in the last part of their group and earlier parts keep their hash.
+def chunk_tasks(tasks, max_size=50):
+    groups = {}
+    for task in sorted(tasks, key=lambda task: task.id):
+        groups.setdefault((task.category, task.priority), []).append(task)
+    chunks = {}
+    for (category, priority), group in groups.items():
+        for part, start in enumerate(range(0, len(group), max_size)):
+            chunks[(category, priority, part)] = group[start:start + max_size]
+    return chunks
+
+
+# Function to hash the task fields a chunk summary depends on
+def chunk_hash(tasks):
+    content = [[task.id, task.title, task.description, task.status.label] for task in tasks]
+    return hashlib.sha256(json.dumps(content).encode("utf-8")).hexdigest()
+
+
+class TaskSummarizer:
+    def __init__(self, max_chunk_size=50):
+        self.max_chunk_size = max_chunk_size
+        # (category, priority, part) -> (content hash, summary) from the last run
+        self._summaries = {}
+        self.chunks_summarized = 0
+        self.chunks_reused = 0
+
+    # Summarize the chunks that changed and return (prompt, inputs) for the final combining call.
+    # Raises the first error if any chunk could not be summarized.
+    def prepare(self, llm, tasks):
+        from langchain.prompts import ChatPromptTemplate
+
+        chunk_prompt = ChatPromptTemplate.from_messages([
+            ("system", CHUNK_SYSTEM_PROMPT),
+            ("human", "Category: {category}, priority: {priority}\nTasks:\n{task_data}\n\nSummary:")
+        ])
+        chunks = chunk_tasks(tasks, self.max_chunk_size)
+        hashes = {key: chunk_hash(chunk) for key, chunk in chunks.items()}
+        changed = [key for key in chunks if self._summaries.get(key, (None,))[0] != hashes[key]]
+
+        batch = [chunk_prompt.format_messages(category=key[0], priority=key[1], task_data=format_task_lines(chunks[key]))
+                 for key in changed]
+        results = get_gateway().complete_many(llm, batch) if batch else []
+        for key, result in zip(changed, results):
+            if isinstance(result, Exception):
+                raise result
+            self._summaries[key] = (hashes[key], result)
+
+        # Forget chunks that no longer exist
+        for key in list(self._summaries):
+            if key not in chunks:
+                del self._summaries[key]
+        self.chunks_summarized += len(changed)
+        self.chunks_reused += len(chunks) - len(changed)
+
+        summaries = "\n".join(f"- {key[0]} / {key[1]} ({len(chunks[key])} tasks): {self._summaries[key][1]}"
+                              for key in sorted(chunks))
+        reduce_prompt = ChatPromptTemplate.from_messages([
+            ("system", REDUCE_SYSTEM_PROMPT),
+            ("human", "Task group summaries:\n{summaries}\n\nSummary:")
+        ])
+        return reduce_prompt, {"summaries": summaries}
@@ -0,0 +1,71 @@
+import os
+import sys
+import json
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from faq_index import FAQIndex, tokenize
+
+
+# Function to build the index from the shipped data the way app.build_faq_index does
+def build_index():
+    def read(name):
+        with open(os.path.join(ROOT, "data", name), encoding="utf-8") as file:
+            return json.load(file)
+
+    entries = [(faq["question"], faq["answer"]) for faq in read("faqs.json")]
+    for program in read("programs.json"):
+        entries.append((program["name"], program["name"]))
+        entries.append((f"{program['name']} program {program['duration']} {program['format']}", program["name"]))
+    for mentor in read("mentors.json"):
+        entries.append((mentor["name"], mentor["name"]))
+        entries.append((f"{mentor['role']} {' '.join(mentor['expertise'])}", mentor["name"]))
+    return FAQIndex(entries)
+
+
+@pytest.fixture(scope="module")
+def index():
+    return build_index()
+
+
+def test_tokenize_drops_stop_words_and_plurals():
+    assert tokenize("Are scholarships available?") == ["scholarship", "available"]
+
+
+@pytest.mark.parametrize("question, answer", [
+    ("How can I apply to a program?", "You can apply"),
+    ("Are there any scholarships available?", "Yes, we offer"),
+    ("What is the time commitment?", "Most programs require"),
+    ("who is Robert Chen", "Robert Chen"),
+    ("Tell me about Sarah Johnson", "Sarah Johnson"),
+    ("tell me about the Executive Leadership Masterclass", "Executive Leadership Masterclass"),
+])
+def test_matches_paraphrased_questions(index, question, answer):
+    match = index.match(question)
+    assert match is not None
+    assert match[0].startswith(answer)
+
+
+@pytest.mark.parametrize("question", [
+    "What time is it in Sydney right now",
+    "Is Robert Downey Jr. starring in the new Marvel movie?",
+    "How long is each program?",
+    "I feel stressed about my career transition",
+    "Can you write me a poem about leadership?",
+    "What's the weather like today?",
+])
+def test_unrelated_questions_do_not_match(index, question):
+    assert index.match(question) is None
+
+
+def test_unknown_words_lower_the_score(index):
+    _, exact = index.match("Robert Chen")
+    _, diluted = index.match("Robert Chen marvel movie")
+    assert diluted < exact
+
+
+def test_empty_index_matches_nothing():
+    assert FAQIndex([]).match("How do I apply?") is None
@@ -0,0 +1,45 @@
+import os
+import sys
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from task_search import TaskSearchIndex, tokenize
+
+
+def task(id, title, description=""):
+    return SimpleNamespace(id=id, title=title, description=description)
+
+
+def test_tokenize_keeps_every_word():
+    assert tokenize("What is the Q3_report for?") == ["what", "is", "the", "q3_report", "for"]
+
+
+def test_search_matches_stop_words_and_plurals_exactly():
+    index = TaskSearchIndex([task(1, "Call the bank"), task(2, "Review contracts"), task(3, "Review contract")])
+    assert set(index.search("the")) == {1}
+    assert set(index.search("contracts")) == {2}
+
+
+def test_search_matches_prefixes_and_substrings():
+    index = TaskSearchIndex([task(1, "Mentor relationship check-in"), task(2, "Ship the release")])
+    assert set(index.search("ship")) == {1, 2}
+    assert set(index.search("relation")) == {1}
+    scores = index.search("ship")
+    assert scores[2] > scores[1]
+
+
+def test_search_requires_every_word():
+    index = TaskSearchIndex([task(1, "Plan offsite", "book the venue"), task(2, "Plan budget")])
+    assert set(index.search("plan venue")) == {1}
+    assert index.search("plan nothing") == {}
+
+
+def test_removed_and_updated_tasks_leave_the_index():
+    index = TaskSearchIndex([task(1, "Draft newsletter")])
+    index.add(task(1, "Send newsletter"))
+    assert index.search("draft") == {}
+    index.remove(1)
+    assert index.search("newsletter") == {}
+    assert index.terms == []
@@ -0,0 +1,78 @@
+import os
+import sys
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from task_model import Task
+from task_state import SharedTasks
+from task_store import MemoryTaskStore
+
+
+def record(title, due_date=None, status="Pending"):
+    return {"title": title, "description": "", "priority": "High", "category": "Work", "status": status,
+            "created_at": "2026-01-01 09:00", "due_date": due_date, "completed_at": None}
+
+
+def test_sync_applies_writes_from_other_processes():
+    store = MemoryTaskStore()
+    first = store.add(record("Write report"))
+    shared = SharedTasks(store, reminder_interval=3600)
+    second = store.add(record("Book venue"))
+    store.update(first["id"], {"status": "Completed"})
+    store.delete(second["id"])
+    third = store.add(record("Send invites"))
+    shared.sync()
+    assert set(shared.tasks) == {first["id"], third["id"]}
+    assert shared.tasks[first["id"]].version == 2
+    assert shared.stats.total == 2
+    assert shared.stats.count("status", "Completed") == 1
+    assert set(shared.search.search("invites")) == {third["id"]}
+
+
+def test_older_versions_never_replace_newer_ones():
+    store = MemoryTaskStore()
+    stored = store.add(record("Write report"))
+    shared = SharedTasks(store, reminder_interval=3600)
+    newer = shared.tasks[stored["id"]].replace(title="Write final report", version=3)
+    shared.apply([newer])
+    shared.apply([Task.from_record(dict(stored, version=2))])
+    assert shared.tasks[stored["id"]].title == "Write final report"
+
+
+def test_readers_keep_the_task_dict_they_read():
+    store = MemoryTaskStore()
+    shared = SharedTasks(store, reminder_interval=3600)
+    tasks = shared.tasks
+    shared.apply([Task.from_record(store.add(record("Write report")))])
+    assert tasks == {}
+    assert len(shared.tasks) == 1
+
+
+def test_find_duplicate_sees_tasks_added_later():
+    store = MemoryTaskStore()
+    shared = SharedTasks(store, reminder_interval=3600)
+    assert shared.find_duplicate("Draft the weekly report") is None
+    shared.apply([Task.from_record(store.add(record("Draft the weekly reports")))])
+    assert shared.find_duplicate("Draft the weekly report").title == "Draft the weekly reports"
+
+
+def test_every_session_gets_each_reminder():
+    store = MemoryTaskStore()
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    store.add(record("Pay invoice", due_date=yesterday))
+    shared = SharedTasks(store, reminder_interval=3600)
+    shared.reminders.check()
+
+    # A session that starts now sees what is due now, then only new reminders
+    position, reminders = shared.reminders.current()
+    assert reminders == [f"'Pay invoice' is overdue (due {yesterday})"]
+    shared.apply([Task.from_record(store.add(record("Renew license", due_date=yesterday)))])
+    shared.reminders.check()
+    position, reminders = shared.reminders.since(position)
+    assert reminders == [f"'Renew license' is overdue (due {yesterday})"]
+    assert shared.reminders.since(position)[1] == []
+
+    # A session that started before both reminders gets both
+    assert len(shared.reminders.since(0)[1]) == 2